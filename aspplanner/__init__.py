@@ -1,9 +1,62 @@
 # register the planner.
-from aspplanner.up_asp_planner import UPASPPlanner
-import unified_planning as up
+import sys
+import threading
+import importlib.util
+
+__register_lock__ = threading.Lock()
+
+
+def register(environment=None):
+    """Registers the planner as 'ASPPlanner' in the (default) UP environment, once per environment."""
+    import unified_planning as up
+    env = up.environment.get_environment() if environment is None else environment
+    # the check and the registration are one step, add_engine fails on a second registration.
+    with __register_lock__:
+        if 'ASPPlanner' not in env.factory.engines:
+            env.factory.add_engine('ASPPlanner', 'aspplanner.up_asp_planner', 'UPASPPlanner')
+
+
+class __RegisterOnImport__:
+    # importing unified_planning is most of the start-up time, so the planner is only
+    # registered when unified_planning is imported by someone else. The finder stays on
+    # sys.meta_path (it is never changed while the import system walks it), finds the
+    # module through the other finders and registers once it has been executed.
+    def __init__(self):
+        self.finding = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != 'unified_planning' or getattr(self.finding, 'active', False): return None
+        self.finding.active = True
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            self.finding.active = False
+        if spec is None or spec.loader is None or not hasattr(spec.loader, 'exec_module'): return spec
+        exec_module = spec.loader.exec_module
+
+        def _exec_module(module):
+            exec_module(module)
+            register()
+
+        spec.loader.exec_module = _exec_module
+        return spec
 
 
 # Register the planner to the UP framework
-# This is done once the package is imported so its transparent to the user.
-env = up.environment.get_environment()
-env.factory.add_engine('ASPPlanner', 'aspplanner.up_asp_planner', 'UPASPPlanner')
\ No newline at end of file
+# This is done once unified_planning is imported so its transparent to the user.
+if 'unified_planning' in sys.modules:
+    register()
+else:
+    sys.meta_path.insert(0, __RegisterOnImport__())
+
+
+def __getattr__(name):
+    # `env` is the default UP environment the planner is registered in, as it always was.
+    if name == 'env':
+        import unified_planning as up
+        register()
+        return up.environment.get_environment()
+    if name == 'UPASPPlanner':
+        from aspplanner.up_asp_planner import UPASPPlanner
+        return UPASPPlanner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
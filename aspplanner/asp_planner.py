@@ -1,72 +1,594 @@
 
 
 import os
+import json
+import time
 import clingo
 
+from contextlib import contextmanager
+from functools import lru_cache
+
+from itertools import chain, combinations
+
 from unified_planning.plans import SequentialPlan, ActionInstance
 
 from aspplanner.compilers.asp_seq_encoder import ASPSeqEncoder
-from aspplanner.compilers.asp_facts import ASPOccursFluent, ASPConstraint, ASPRule, ASPCmd, ASPFact
+from aspplanner.compilers.asp_grounded_encoder import ASPGroundedEncoder
+from aspplanner.compilers.asp_sas_encoder import ASPSasEncoder
+from aspplanner.compilers.asp_window_encoder import ASPWindowEncoder
+from aspplanner.compilers.grounded_task import GroundedTask
+from aspplanner.compilers.landmarks import LandmarkExtractor
+from aspplanner.compilers.macros import MacroLibrary, MacroCompiler
+from aspplanner.compilers.grounding_estimator import GroundingEstimator
+from aspplanner.compilers.asp_facts import ASPOccursFluent, ASPConstraint, ASPRule, ASPCmd, ASPFact, ASPGroundedAction
+
+from aspplanner.history import HorizonHistory
+from aspplanner.propagators import FramePropagator
+from aspplanner.utilities import decode_action, validate, environment_lock
 
-from aspplanner.utilities import AspPlanParser, validate
+MAX_HORIZON = 1000
 
 encoder_map = {
-    'seq': ASPSeqEncoder,
+    'seq':          ASPSeqEncoder,
+    'seq-grounded': ASPGroundedEncoder,
+    'seq-lazy':     ASPSeqEncoder,
+    'reg':          ASPSeqEncoder,
+    'sas':          ASPSasEncoder,
+    'seq-windows':  ASPWindowEncoder,
 }
 
 encoder_file_map = {
-    'seq': os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-horizon.lp'),
+    'seq':          os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-horizon.lp'),
+    'seq-grounded': os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-horizon.lp'),
+    'seq-lazy':     os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-lazy.lp'),
+    'reg':          os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-regression.lp'),
+    'sas':          os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-sas.lp'),
+    'seq-windows':  os.path.join(os.path.dirname(__file__), 'encodings', 'sequential-windows.lp'),
 }
 
+# encodings that number their steps from the goal, their plans are decoded back to front.
+regression_encodings = {'reg'}
+
+# encodings that only carry fluent values over while a later step can read them, their states are partial.
+windowed_encodings = {'seq-windows'}
+
+# parts of the compiled task that constrain forward states, which regression and windowed encodings do not have.
+forward_encoding_parts = {'_landmarks', '_move_pruning'}
+
+# encodings that leave part of the semantics to a propagator, registered on every control.
+propagator_map = {
+    'seq-lazy': FramePropagator,
+}
+
+# encoding='auto' grounds in Python when the static preconditions rule out at least this
+# share of the lifted groundings, and there are not too many groundings to enumerate.
+AUTO_GROUNDED_MIN_PRUNED  = 0.5
+AUTO_GROUNDED_MAX_ACTIONS = 200000
+
+heuristic_file_map = {
+    'goal':      os.path.join(os.path.dirname(__file__), 'encodings', 'heuristics', 'goal.lp'),
+    'achievers': os.path.join(os.path.dirname(__file__), 'encodings', 'heuristics', 'achievers.lp'),
+    'rintanen':  os.path.join(os.path.dirname(__file__), 'encodings', 'heuristics', 'rintanen.lp'),
+}
+
+action_costs_file = os.path.join(os.path.dirname(__file__), 'encodings', 'action-costs.lp')
+
+portfolio_file_map = {
+    'planning': os.path.join(os.path.dirname(__file__), 'portfolios', 'planning.port'),
+}
+
+
+@lru_cache(maxsize=None)
+def load_lp_file(filename, mtime=None):
+    # every planner of a process shares the filtered lines of an encoding file, as long as it is not modified.
+    with open(filename, 'r') as f:
+        return frozenset(filter(lambda l: l != '' and not '%' in l, map(str.strip, f.readlines())))
+
 
 class ASPPlanner:
-    def __init__(self, problem, encoder_type):
-        self.compiled_task = encoder_map[encoder_type]().compile(problem)
-        self.task          = self.compiled_task.problem
-        self.plan_parser   = AspPlanParser()
-        self.base_formula  = self.__load_asp_encoding_formula__(encoder_type)
+    """
+    Plans for one problem. All state of a call lives on the planner, so planners of the
+    same process can run on separate threads: everything that touches the problem's UP
+    environment (compiling, decoding, validating) holds `self.lock`, grounding and
+    solving run in parallel. Problems of different environments do not share a lock.
+    """
+
+    def __init__(self, problem, encoder_type, **options):
+        self.options       = options
+        self.lock          = environment_lock(problem.environment)
+        # wall and cpu seconds per phase, and the ground program size and solver statistics per horizon.
+        self.timings       = dict.fromkeys(('compile', 'encode', 'ground', 'solve', 'decode', 'validate'), 0.0)
+        self.cpu_timings   = dict.fromkeys(self.timings, 0.0)
+        self.horizon_stats = []
+        self.phase_stack   = []
+        # called as profiler(event, data) for every 'phase' and 'horizon' that ends.
+        self.profiler      = options.get('profiler', None)
+        self.library       = None if options.get('macros', None) is None else MacroLibrary(options['macros'])
+        self.macros        = {}
+        self.history       = None if options.get('history', None) is None else HorizonHistory(options['history'])
+        with self.__phase__('compile'), self.lock:
+            if self.library is not None:
+                # macros are plain actions to the encoder, plans are expanded in __extract_plan__.
+                problem     = MacroCompiler(self.library, int(options.get('macro_support', 2))).compile(problem).problem
+                self.macros = {name.replace('-', '_'): [(a.replace('-', '_'), idx) for a, idx in steps] for name, steps in problem.macros.items()}
+            if encoder_type == 'auto':
+                encoder_type, self.compiled_task = self.__auto_encoding__(problem)
+            else:
+                self.compiled_task = self.__encoder__(encoder_map[encoder_type]).compile(problem)
+            self.task          = self.compiled_task.problem
+            self.encoding      = encoder_type
+        with self.__phase__('encode'):
+            self.base_formula  = self.__load_asp_encoding_formula__(encoder_type)
+            if self.options.get('heuristic', None) is not None:
+                self.base_formula |= self.__load_asp_heuristic_formula__(self.options['heuristic'])
         self.logs          = []
+        self.min_horizon   = self.task.horizon_lower_bound
+        self.controls      = {}
+        self.warm_start    = None
+        self.hints         = set()
+        self.horizon       = None
+        self.predicted     = []
+        self.estimator     = None
+        self.cost          = None
+        self.optimal       = False
+        self.timed_out     = False
+
+    def __auto_encoding__(self, problem):
+        # the lifted compilation is needed for the estimate anyway, and is kept when grounding does not pay off.
+        lifted     = self.__encoder__(ASPSeqEncoder).compile(problem)
+        schemas    = GroundingEstimator(lifted.problem).schemas
+        groundings = sum(s.groundings for s in schemas)
+        applicable = sum(s.applicable for s in schemas)
+        if groundings == 0 or groundings > AUTO_GROUNDED_MAX_ACTIONS or applicable > (1 - AUTO_GROUNDED_MIN_PRUNED) * groundings:
+            return 'seq', lifted
+        return 'seq-grounded', self.__encoder__(ASPGroundedEncoder).ground(lifted)
+
+    def __encoder__(self, encoder_class):
+        return encoder_class(landmarks=self.options.get('landmarks', False), move_pruning=self.options.get('move_pruning', False))
+
+    def __task_program__(self, excluded=()):
+        # the program lines of the compiled task that apply to the encoding.
+        if self.encoding in regression_encodings | windowed_encodings: excluded = set(excluded) | forward_encoding_parts
+        return set.union(set(), *[v for k, v in self.task.asp_encoding_str.items() if k not in excluded])
+
+    @contextmanager
+    def __phase__(self, name):
+        # phases nest (e.g. decoding happens while solving), each one only counts its own time.
+        _start, _cpu = time.perf_counter(), time.process_time()
+        self.phase_stack.append([0.0, 0.0])
+        try:
+            yield
+        finally:
+            nested_wall, nested_cpu = self.phase_stack.pop()
+            wall, cpu = time.perf_counter() - _start, time.process_time() - _cpu
+            if len(self.phase_stack) > 0:
+                self.phase_stack[-1][0] += wall
+                self.phase_stack[-1][1] += cpu
+            self.timings[name]     += wall - nested_wall
+            self.cpu_timings[name] += cpu - nested_cpu
+            if self.profiler is not None: self.profiler('phase', {'phase': name, 'wall': wall - nested_wall, 'cpu': cpu - nested_cpu})
+
+    def __record_horizon__(self, horizon, ctl):
+        stats = ctl.statistics
+        record = {
+            'horizon':   horizon,
+            'atoms':     int(stats['problem']['lp']['atoms']),
+            'rules':     int(stats['problem']['lp']['rules']),
+            'conflicts': int(stats['solving']['solvers']['conflicts']),
+            'choices':   int(stats['solving']['solvers']['choices']),
+            'solve_time': stats['summary']['times']['solve'],
+        }
+        self.horizon_stats.append(record)
+        if self.profiler is not None: self.profiler('horizon', record)
+
+    def statistics(self):
+        """Phase timings and per-horizon statistics, as written to a trace file."""
+        return {
+            'timings':  {phase: {'wall': self.timings[phase], 'cpu': self.cpu_timings[phase]} for phase in self.timings},
+            'horizons': self.horizon_stats,
+            'horizon':  self.horizon,
+            'encoding': self.encoding,
+            'logs':     self.logs,
+        }
+
+    def reset_statistics(self):
+        """Starts the timings, horizon statistics and logs over, a planner that is kept alive reports every call on its own."""
+        self.timings       = dict.fromkeys(self.timings, 0.0)
+        self.cpu_timings   = dict.fromkeys(self.timings, 0.0)
+        self.horizon_stats = []
+        self.logs          = []
+
+    def metrics(self):
+        """The statistics flattened into the string metrics of a PlanGenerationResult."""
+        metrics = {}
+        for phase in self.timings:
+            metrics[f'{phase}_time'] = f'{self.timings[phase]:.6f}'
+            metrics[f'{phase}_cpu_time'] = f'{self.cpu_timings[phase]:.6f}'
+        for key in ('atoms', 'rules', 'conflicts', 'choices'):
+            metrics[key] = str(sum(h[key] for h in self.horizon_stats))
+        metrics['encoding'] = self.encoding
+        metrics['horizon']  = str(self.horizon)
+        metrics['horizons'] = json.dumps(self.horizon_stats)
+        return metrics
+
+    def write_trace(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.statistics(), f, indent=2)
+
+    def __validate__(self, plan):
+        with self.__phase__('validate'), self.lock:
+            return validate(self.task, plan)
     
     def __load_asp_encoding_formula__(self, encodingname):
         assert encodingname in encoder_file_map.keys(), f"Unsupported encoding name: {encodingname}"
-        model = set(open(encoder_file_map[encodingname], 'r').readlines())
-        model = set(filter(lambda l: l != '' and not '%' in l, map(str.strip, model)))
-        return model
+        return self.__load_lp_file__(encoder_file_map[encodingname])
+
+    def __load_asp_heuristic_formula__(self, heuristicname):
+        # either one of the presets or the path of a user-provided file of #heuristic directives.
+        heuristicfile = heuristic_file_map.get(heuristicname, heuristicname)
+        assert os.path.exists(heuristicfile), f"Unsupported heuristic: {heuristicname}"
+        return self.__load_lp_file__(heuristicfile)
+
+    def __load_lp_file__(self, filename):
+        # a copy, the formulas are extended in place.
+        return set(load_lp_file(filename, os.stat(filename).st_mtime_ns))
     
     def __construct_action__(self, action_tuple):
         # first step get the action from the task.
-        up_action = next(filter(lambda a: a.name == action_tuple[0], self.task.actions), None)
-        assert up_action is not None, f"Action {action_tuple[0]} not found in the task."
-        up_args   = []
-        for arg in action_tuple[1:]:
-            up_args.append(next(filter(lambda p: p.name == arg, self.task.all_objects)))
-        return ActionInstance(up_action, up_args)
+        assert self.task.has_action(action_tuple[0]), f"Action {action_tuple[0]} not found in the task."
+        return ActionInstance(self.task.action(action_tuple[0]), [self.task.object(arg) for arg in action_tuple[1:]])
     
     # This will be multiple plans.
     def __extract_plan__(self, answer):
-        self.actions = sorted(map(lambda a: ASPOccursFluent(a), filter(lambda a: 'occurs' in str(a), answer)), key=lambda a:a.timestep)
-        _plan = SequentialPlan(list(map(self.__construct_action__, map(lambda e: (e['action'], *[eval(a)['value'] for a in e['arguments']]), map(lambda a: self.plan_parser.parse_plan_fact(a.fact_str), self.actions)))))
-        _lifted_plan = _plan.replace_action_instances(self.compiled_task.map_back_action_instance)
+        with self.__phase__('decode'), self.lock:
+            actions = sorted(map(lambda a: ASPOccursFluent(a), filter(lambda a: 'occurs' in str(a), answer)), key=lambda a:a.timestep, reverse=self.encoding in regression_encodings)
+            _plan = SequentialPlan(list(chain.from_iterable(map(self.__expand_macro__, map(self.__construct_action__, map(lambda a: decode_action(a.fact), actions))))))
+            _lifted_plan = _plan.replace_action_instances(self.compiled_task.map_back_action_instance)
         return _lifted_plan
     
+    def __expand_macro__(self, action_instance):
+        if action_instance.action.name not in self.macros: return [action_instance]
+        return [ActionInstance(self.task.action(name), [action_instance.actual_parameters[i] for i in idx]) for name, idx in self.macros[action_instance.action.name]]
+
+    def __clingo_arguments__(self, horizon, models=1):
+        arguments = ['-n', str(models), '-c', f'horizon={horizon}']
+        # a portfolio races its configurations on parallel solver threads, one per line.
+        portfolio = self.options.get('portfolio', None)
+        threads   = int(self.options.get('threads', os.cpu_count() if portfolio is not None else 1))
+        if threads > 1: arguments += ['-t', str(threads)]
+        if portfolio is not None: arguments.append(f'--configuration={portfolio_file_map.get(portfolio, portfolio)}')
+        # #heuristic directives are only honoured by the domain heuristic.
+        if self.options.get('heuristic', None) is not None or len(self.hints) > 0: arguments.append('--heuristic=Domain')
+        return arguments
+
+    def __check_grounding__(self, horizon):
+        # fails fast, before gringo allocates anything, when the `max_ground_atoms`/`max_ground_rules` limits would be exceeded.
+        max_atoms, max_rules = self.options.get('max_ground_atoms', None), self.options.get('max_ground_rules', None)
+        if max_atoms is None and max_rules is None: return
+        if self.estimator is None:
+            with self.lock: self.estimator = GroundingEstimator(self.task)
+        self.estimator.check(horizon, max_atoms, max_rules)
+
+    def __control__(self, arguments):
+        ctl = clingo.Control(arguments=arguments)
+        if self.encoding in propagator_map: ctl.register_propagator(propagator_map[self.encoding]())
+        return ctl
+
+    def __ground__(self, horizon):
+        # a planner that is kept alive (e.g. by the daemon) reuses the control of its solved horizon.
+        if horizon in self.controls: return self.controls[horizon]
+        self.__check_grounding__(horizon)
+        with self.__phase__('ground'):
+            ctl = self.__control__(self.__clingo_arguments__(horizon))
+            # debug lp program.
+            ctl.add("base", [], '\n'.join(set.union(self.base_formula, self.hints, self.__task_program__())))
+            ctl.ground([("base", [])])
+        return ctl
+    
+    def __horizon_schedule__(self, predict=False):
+        # a warm start first tries the horizons around the length of the previous plan, and
+        # with `predict` the history may suggest some. The plan found there can be longer than the shortest.
+        max_horizon = int(self.options.get('max_horizon', MAX_HORIZON))
+        if self.warm_start is not None:
+            first = [h for h in range(len(self.warm_start) - 1, len(self.warm_start) + 2) if self.min_horizon <= h < max_horizon]
+        elif predict and self.history is not None:
+            with self.lock: first = [h for h in self.history.schedule(self.task) if self.min_horizon <= h < max_horizon]
+        else:
+            first = []
+        self.predicted = first
+        yield from first
+        yield from (h for h in range(self.min_horizon, max_horizon) if h not in first)
+
     def plan(self):
+        _plan = self.__plan_serialized__() if self.options.get('goal_batch', None) else self.__plan_horizons__()
+        if self.history is not None and not self.options.get('goal_batch', None) and len(_plan.actions) > 0:
+            solved = self.horizon_stats[-1]
+            self.history.record(self.task, self.encoding, self.horizon, solved['atoms'], solved['rules'], self.timings['solve'])
+        if self.library is not None and self.options.get('learn_macros', False) and len(_plan.actions) > 0:
+            self.library.learn(self.task, _plan)
+            self.library.save()
+        return _plan
+
+    def __plan_horizons__(self):
         _plan = SequentialPlan([])
-        for n in range(0, 1000):
+        for n in self.__horizon_schedule__(predict=True):
             if len(_plan.actions) > 0: break
-            ctl = clingo.Control(arguments=['-n', '1', '-c', f'horizon={n}'])
-            # debug lp program.
-            ctl.add("base", [], '\n'.join(set.union(self.base_formula, set.union(*list(self.task.asp_encoding_str.values())))))
-            ctl.ground([("base", [])])
-            with ctl.solve(yield_=True) as solution_iterator:
-                if ctl.is_conflicting: continue
-                for solution in solution_iterator:
+            self.horizon = n
+            ctl = self.__ground__(n)
+            with self.__phase__('solve'), ctl.solve(yield_=True) as solution_iterator:
+                # a program refuted while grounding has no models, its horizon is recorded all the same.
+                for solution in ([] if ctl.is_conflicting else solution_iterator):
                     _plan = self.__extract_plan__(set(solution.symbols(shown=True)))
                     if len(_plan.actions) > 0: break
+            self.__record_horizon__(n, ctl)
+            if len(_plan.actions) > 0 and self.warm_start is None and n not in self.predicted:
+                # horizons below n had no plan, so the next call can start from here.
+                self.min_horizon = n
+                self.controls    = {n: ctl}
                     
-        validation_result, reason = validate(self.task, _plan)
+        validation_result, reason = self.__validate__(_plan)
         
         if not validation_result:
             self.logs.append(f'Plan validation failed: {reason}')
             _plan = SequentialPlan([])
         
-        return _plan
\ No newline at end of file
+        return _plan
+
+    def __plan_serialized__(self):
+        """
+        Goal serialisation: plans for growing subsets of the goals (`goal_batch` more at a
+        time), each stage starting from the state the plan so far reaches. The goals are
+        ordered by their landmark orderings (with the `landmarks` option) and by how early
+        they are relaxed reachable. The plan is not optimal, but every stage only needs a
+        short horizon.
+        """
+        # the stages start from other states and aim at other goals than the windows were computed for.
+        assert self.encoding not in regression_encodings | windowed_encodings, f"Goal serialisation needs the states of a forward encoding, not '{self.encoding}'."
+        goals   = self.__ordered_goals__()
+        batch   = int(self.options['goal_batch'])
+        # the landmark constraints are about all goals and the original initial state.
+        program = set.union(self.base_formula, self.hints, self.__task_program__(('_initial_state', '_goal_state', '_landmarks')))
+        state   = self.task.asp_encoding_str['_initial_state']
+        steps   = []
+        for end in range(batch, len(goals) + batch, batch):
+            stage = self.__solve_stage__(program, state, set(goals[:end]))
+            if stage is None:
+                self.logs.append(f'Goal serialisation found no plan for the first {min(end, len(goals))} goals.')
+                return SequentialPlan([])
+            prefix, state = stage
+            steps += prefix
+
+        self.horizon = len(steps)
+        _plan = SequentialPlan([]) if len(steps) == 0 else self.__extract_plan__(set(clingo.Function('occurs', [a, clingo.Number(t)]) for t, a in enumerate(steps, start=1)))
+        validation_result, reason = self.__validate__(_plan)
+        if not validation_result:
+            self.logs.append(f'Plan validation failed: {reason}')
+            _plan = SequentialPlan([])
+        return _plan
+
+    def __ordered_goals__(self):
+        with self.lock:
+            levels = GroundedTask(self.task).relaxed_levels()
+            depths = LandmarkExtractor(self.task).ordering_depths() if self.options.get('landmarks', False) else {}
+        # negative goals usually follow from achieving the positive ones, so they come last.
+        def _key(goal):
+            fact = str(goal.fluent)
+            if goal.value != 'true': return (max(depths.values(), default=0) + 1, len(levels) + 1, str(goal))
+            return (depths.get(fact, 0), levels.get(fact, len(levels)), str(goal))
+        return [str(g) for g in sorted(self.task.asp_encoding['_goal_state'], key=_key)]
+
+    def __solve_stage__(self, program, state, goals):
+        # returns the steps of the shortest plan for the goals and the state it reaches.
+        for n in range(0, int(self.options.get('max_horizon', MAX_HORIZON))):
+            self.__check_grounding__(n)
+            with self.__phase__('ground'):
+                ctl = self.__control__(self.__clingo_arguments__(n))
+                ctl.add("base", [], '\n'.join(set.union(program, state, goals)))
+                ctl.ground([("base", [])])
+            with self.__phase__('solve'), ctl.solve(yield_=True) as solution_iterator:
+                model = next(iter(solution_iterator), None)
+                if model is not None:
+                    atoms = model.symbols(atoms=True)
+                    steps = [s.arguments[0] for s in sorted((s for s in atoms if s.name == 'occurs'), key=lambda s: s.arguments[1].number)]
+                    state = set(f'initialState({s.arguments[0]}, {s.arguments[1]}).' for s in atoms if s.name == 'holds' and s.arguments[2].number == n)
+            self.__record_horizon__(n, ctl)
+            if model is not None: return steps, state
+        return None
+
+    def anytime_plans(self, timeout=None):
+        """
+        Yields every plan that is cheaper than the previous one, as soon as it is found.
+
+        The horizons are solved with clingo's optimisation (`opt_strategy` option, branch
+        and bound by default), which reports every improving model. Longer horizons are
+        then searched for plans cheaper than the best one, until no horizon can beat it
+        since every step costs at least the cheapest action. Then `self.optimal` is set.
+        Without action costs every action costs 1, so the first plan is optimal. With
+        actions of cost 0 longer plans can always be cheaper, so the search stops after the
+        first horizon with a plan, or goes on up to the `max_horizon` option when it is set,
+        and the plan is only known to be optimal when it costs 0.
+
+        `self.cost` is the cost of the last plan, scaled by `task.action_cost_scale`.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        minimize = self.__load_lp_file__(action_costs_file)
+        if self.task.action_costs is None:
+            if any(m.is_minimize_action_costs() for m in self.task.quality_metrics):
+                self.logs.append('Only constant action costs are supported, minimising the plan length instead.')
+            minimize.add('cost(Action, 1) :- action(Action).')
+        min_cost = 1 if self.task.action_costs is None else min(self.task.action_costs.values(), default=1)
+        self.cost, self.optimal, self.timed_out = None, False, False
+
+        for n in self.__horizon_schedule__():
+            if self.cost is not None and (n * min_cost >= self.cost or self.cost == 0):
+                self.optimal = True
+                break
+            if self.cost is not None and min_cost == 0 and self.options.get('max_horizon', None) is None: break
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                self.timed_out = True
+                break
+            self.horizon = n
+            for _plan, cost in self.__optimise__(n, minimize, remaining):
+                if self.cost is not None and cost >= self.cost: continue
+                self.cost = cost
+                yield _plan
+
+    def __optimise__(self, horizon, minimize, timeout):
+        # the bound on the best cost so far is part of the program, so every horizon gets a fresh control.
+        arguments = self.__clingo_arguments__(horizon, models=0) + ['--opt-mode=opt', f"--opt-strategy={self.options.get('opt_strategy', 'bb')}"]
+        bound = set() if self.cost is None else {f':- #sum {{ C, Action, T : occurs(Action, T), cost(Action, C) }} >= {self.cost}.'}
+        self.__check_grounding__(horizon)
+        with self.__phase__('ground'):
+            ctl = self.__control__(arguments)
+            ctl.add("base", [], '\n'.join(set.union(self.base_formula, minimize, bound, self.__task_program__())))
+            ctl.ground([("base", [])])
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with ctl.solve(yield_=True, async_=True) as handle:
+            while True:
+                with self.__phase__('solve'):
+                    handle.resume()
+                    finished = handle.wait(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+                if not finished:
+                    handle.cancel()
+                    self.timed_out = True
+                    break
+                model = handle.model()
+                if model is None: break
+                _plan = self.__extract_plan__(set(model.symbols(shown=True)))
+                if len(_plan.actions) == 0: continue
+                validation_result, reason = self.__validate__(_plan)
+                if not validation_result:
+                    self.logs.append(f'Plan validation failed: {reason}')
+                    continue
+                yield _plan, model.cost[0]
+        self.__record_horizon__(horizon, ctl)
+
+    def enumerate_plans(self, k, distance='hamming', min_distance=1, timeout=None):
+        """
+        Yields up to `k` distinct plans, shortest first, as soon as they are found.
+
+        Every horizon is grounded once and its models are streamed from that control.
+        Optionally the plans are kept `min_distance` apart from all earlier ones:
+            hamming: the number of steps at which two plans differ, enforced with
+                     nogoods added while solving (there are C(horizon, d - 1) per plan,
+                     so this is meant for small distances).
+            actions: the size of the symmetric difference of their sets of ground
+                     actions, enforced with a #count constraint grounded per plan onto
+                     the same control.
+        """
+        assert distance in ('hamming', 'actions'), f"Unsupported plan distance: {distance}"
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        found, parts, self.timed_out = [], [], False
+
+        for n in self.__horizon_schedule__():
+            if len(found) >= k or self.timed_out: break
+            self.horizon = n
+            # the control is extended below, so it is not reused for plan().
+            ctl = self.controls.pop(n, None) or self.__ground__(n)
+            ctl.configuration.solve.models = '0'
+            with self.__phase__('ground'):
+                ctl.add('enumerate', [], 'used(Action) :- occurs(Action, T).')
+                ctl.ground([('enumerate', [])])
+                for idx, part in enumerate(parts):
+                    ctl.add(f'diverse_{idx}', [], part)
+                    ctl.ground([(f'diverse_{idx}', [])])
+            if distance == 'hamming':
+                with ctl.backend() as backend:
+                    for steps in found:
+                        for nogood in self.__hamming_nogoods__(steps, n, min_distance):
+                            atoms = [ctl.symbolic_atoms[s] for s in nogood]
+                            if all(a is not None for a in atoms): backend.add_rule([], [a.literal for a in atoms])
+
+            exhausted = False
+            while not exhausted and len(found) < k and not self.timed_out:
+                exhausted = True
+                with ctl.solve(yield_=True, async_=True) as handle:
+                    while len(found) < k:
+                        with self.__phase__('solve'):
+                            handle.resume()
+                            finished = handle.wait(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+                        if not finished:
+                            handle.cancel()
+                            self.timed_out = True
+                            break
+                        model = handle.model()
+                        if model is None: break
+                        symbols = set(model.symbols(shown=True))
+                        steps   = tuple(s.arguments[0] for s in sorted((s for s in symbols if s.name == 'occurs'), key=lambda s: s.arguments[1].number))
+                        if distance == 'hamming':
+                            for nogood in self.__hamming_nogoods__(steps, n, min_distance): model.context.add_nogood([(s, True) for s in nogood])
+                        if len(steps) == 0 or steps in found: continue
+                        _plan = self.__extract_plan__(symbols)
+                        validation_result, reason = self.__validate__(_plan)
+                        if not validation_result:
+                            self.logs.append(f'Plan validation failed: {reason}')
+                            continue
+                        found.append(steps)
+                        yield _plan
+                        if distance == 'actions':
+                            # the new constraint has to be grounded, which needs a new solve call.
+                            parts.append(self.__action_set_program__(len(parts), steps, min_distance))
+                            ctl.add(f'diverse_{len(parts) - 1}', [], parts[-1])
+                            exhausted = False
+                            break
+                if not exhausted:
+                    with self.__phase__('ground'): ctl.ground([(f'diverse_{len(parts) - 1}', [])])
+            self.__record_horizon__(n, ctl)
+
+    def __hamming_nogoods__(self, steps, horizon, min_distance):
+        # plans within the distance agree with `steps` on more than max(horizon, len(steps)) - min_distance steps.
+        agreements = max(horizon, len(steps)) - min_distance + 1
+        occurs = [clingo.Function('occurs', [a, clingo.Number(t)]) for t, a in enumerate(steps, start=1) if t <= horizon]
+        if agreements > len(occurs): return []
+        return [list(c) for c in combinations(occurs, max(agreements, 0))]
+
+    def __action_set_program__(self, idx, steps, min_distance):
+        facts = ' '.join(f'previous({idx}, {a}).' for a in set(steps))
+        return facts + f' :- #count {{ A : used(A), not previous({idx}, A) ; A : previous({idx}, A), not used(A) }} < {min_distance}.'
+
+    def replan(self, previous_plan):
+        """
+        Plans again, warm-started from a previous plan (e.g. after execution deviated from it).
+
+        The longest suffix of the previous plan that is still valid is returned as is.
+        Otherwise the search starts at horizons around the previous plan length, and the
+        domain heuristic prefers the previous plan's actions (at their previous steps).
+        """
+        with self.lock: previous = self.__task_action_instances__(previous_plan)
+        for idx in range(len(previous)):
+            suffix = SequentialPlan(previous[idx:])
+            if self.__validate__(suffix)[0]:
+                self.logs.append(f'Reused the previous plan from step {idx}.')
+                # over the actions of the original problem, like the plans of plan().
+                with self.lock: return suffix.replace_action_instances(self.compiled_task.map_back_action_instance)
+
+        self.warm_start = previous
+        self.hints      = self.__warm_start_formula__(previous)
+        self.controls   = {}
+        try:
+            return self.plan()
+        finally:
+            # the warm start only applies to this call.
+            self.warm_start, self.hints, self.controls = None, set(), {}
+
+    def __task_action_instances__(self, plan):
+        # the compiled task renamed actions and objects, see Renamer.
+        instances = []
+        for action_instance in plan.actions:
+            name = action_instance.action.name.replace('-', '_')
+            args = [str(p).replace('-', '_') for p in action_instance.actual_parameters]
+            if not self.task.has_action(name) or not all(self.task.has_object(a) for a in args): return []
+            instances.append(ActionInstance(self.task.action(name), [self.task.object(a) for a in args]))
+        return instances
+
+    def __warm_start_formula__(self, previous):
+        hints = set()
+        # a regression encoding counts the steps from the end of the plan.
+        steps = range(len(previous), 0, -1) if self.encoding in regression_encodings else range(1, len(previous) + 1)
+        for step, action_instance in zip(steps, previous):
+            term = ASPGroundedAction(action_instance.action, [p.object() for p in action_instance.actual_parameters])
+            hints.add(f'#heuristic occurs({term}, T) : time(T), T > 0. [1, sign]')
+            hints.add(f'#heuristic occurs({term}, {step}). [1, level]')
+        return hints
\ No newline at end of file
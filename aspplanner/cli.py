@@ -0,0 +1,148 @@
+"""Command line entry point of the planner: `aspplanner batch` and `aspplanner serve`."""
+
+import os
+import sys
+import json
+import math
+import time
+import signal
+import argparse
+import threading
+import multiprocessing
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_manifest(path):
+    """
+    Reads a manifest of planning jobs, either a JSON list or one JSON object per line.
+
+    Each job has a `domain` and a `problem` path (relative to the manifest), an optional
+    `id` and optional planner `options`.
+    """
+    with open(path, 'r') as f:
+        content = f.read().strip()
+    jobs = json.loads(content) if content.startswith('[') else [json.loads(l) for l in content.splitlines() if l.strip()]
+    base = os.path.dirname(os.path.abspath(path))
+    for idx, job in enumerate(jobs):
+        job.setdefault('id', str(idx))
+        job['domain']  = os.path.join(base, job['domain'])
+        job['problem'] = os.path.join(base, job['problem'])
+    return jobs
+
+
+def __apply_limits__(cpu_time, memory):
+    import resource
+    if cpu_time is not None:
+        # the soft limit raises SIGXCPU, the hard one kills a job that ignores it. Limits are whole seconds, rounded up.
+        seconds = math.ceil(cpu_time)
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + 1))
+    if memory is not None:
+        _bytes = int(memory) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (_bytes, _bytes))
+
+
+def __run_job__(job, cpu_time, memory, conn):
+    __apply_limits__(cpu_time, memory)
+    from unified_planning.io import PDDLReader
+    from unified_planning.engines import PlanGenerationResultStatus
+    from aspplanner.asp_planner import ASPPlanner
+    from aspplanner.utilities import plan_to_json
+
+    record = {}
+    try:
+        problem = PDDLReader().parse_problem(job['domain'], job['problem'])
+        options = job.get('options', {})
+        planner = ASPPlanner(problem, options.get('encoding', 'seq'), **options)
+        plan    = planner.plan()
+        status  = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY if len(plan.actions) == 0 else PlanGenerationResultStatus.SOLVED_SATISFICING
+        record.update(status=status.name, plan=plan_to_json(plan), horizon=planner.horizon, timings=planner.timings,
+                      cpu_timings=planner.cpu_timings, horizons=planner.horizon_stats, logs=planner.logs)
+    except MemoryError as e:
+        # the grounding limits raise a MemoryError that reports the responsible schemas.
+        record.update(status='MEMOUT', logs=[str(e)] if str(e) else [])
+    except Exception as e:
+        # clingo reports allocation failures as plain runtime errors.
+        record.update(status='MEMOUT' if 'bad_alloc' in str(e) else 'INTERNAL_ERROR', logs=[f'{type(e).__name__}: {e}'])
+    conn.send(record)
+    conn.close()
+
+
+def run_job(job, context, cpu_time=None, memory=None, timeout=None):
+    """Runs one job in its own subprocess under the given limits and returns its JSONL record."""
+    record = {'id': job['id'], 'domain': job['domain'], 'problem': job['problem'], 'status': None,
+              'plan': [], 'horizon': None, 'timings': {}, 'logs': []}
+    _start = time.perf_counter()
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=__run_job__, args=(job, cpu_time, memory, writer))
+    process.start()
+    writer.close()
+
+    if reader.poll(timeout):
+        try:
+            record.update(reader.recv())
+        except EOFError:
+            pass
+    process.join(timeout=1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+        record['status'] = record['status'] or 'TIMEOUT'
+
+    if record['status'] is None:
+        # the job was killed before it could report anything.
+        if process.exitcode == -signal.SIGXCPU: record['status'] = 'TIMEOUT'
+        elif process.exitcode == -signal.SIGKILL and memory is not None: record['status'] = 'MEMOUT'
+        else: record.update(status='INTERNAL_ERROR', logs=[f'Job exited with code {process.exitcode}.'])
+    record['time'] = time.perf_counter() - _start
+    return record
+
+
+def batch(jobs, output, workers=1, cpu_time=None, memory=None, timeout=None):
+    """Runs all jobs with at most `workers` subprocesses at a time, writing one JSONL record per job."""
+    # the fork server pays the start-up costs once and forks clean job processes from it.
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['aspplanner.asp_planner'])
+    lock = threading.Lock()
+
+    def _run(job):
+        record = run_job(job, context, cpu_time, memory, timeout)
+        with lock:
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+        return record
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(_run, jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='aspplanner', description='ASP based classical planner.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = commands.add_parser('batch', help='solve a manifest of domain/problem pairs')
+    batch_parser.add_argument('manifest', help='JSON or JSONL manifest of jobs')
+    batch_parser.add_argument('-o', '--output', default='-', help='JSONL output file (default: stdout)')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of parallel jobs')
+    batch_parser.add_argument('--cpu-time', type=float, default=None, help='CPU time limit per job in seconds')
+    batch_parser.add_argument('--memory', type=int, default=None, help='memory limit per job in MiB')
+    batch_parser.add_argument('--timeout', type=float, default=None, help='wall clock limit per job in seconds')
+
+    commands.add_parser('serve', help='run the planning daemon (see `aspplanner serve --help`)', add_help=False)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['serve']:
+        from aspplanner.daemon import main as serve
+        return serve(argv[1:])
+
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        batch(load_manifest(args.manifest), output, args.jobs, args.cpu_time, args.memory, args.timeout)
+    finally:
+        if output is not sys.stdout: output.close()
+
+
+if __name__ == '__main__':
+    main()
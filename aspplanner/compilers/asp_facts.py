@@ -1,3 +1,4 @@
+import re
 
 from unified_planning.shortcuts import FNode
 
@@ -93,6 +94,35 @@ class ASPType:
         
     def __str__(self):
         return f"type(\"{self.up_type.name}\")"
+
+    @property
+    def predicate(self):
+        # the unary domain predicate of the type, e.g. has_truck.
+        return 'has_' + re.sub(r'\W', '_', self.up_type.name)
+
+    def domain(self, term):
+        return f"{self.predicate}({term})"
+
+    def ancestors(self):
+        """The type and its supertypes, the types an object of this type belongs to."""
+        t = self.up_type
+        while t is not None:
+            yield ASPType(t)
+            t = t.father
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    def __eq__(self, value):
+        return str(self) == str(value)
+
+class ASPTypeDomain:
+    def __init__(self, t):
+        self.asp_type = ASPType(t)
+
+    def __str__(self):
+        # types without objects still have a (then empty) domain predicate.
+        return f"#defined {self.asp_type.predicate}/1."
     
     def __hash__(self):
         return hash(str(self))
@@ -134,7 +164,12 @@ class ASPHasConstant:
         self.asp_constant = ASPConstant(c)
         
     def __str__(self):
-        return f"has({str(self.asp_constant)}, {str(self.asp_type)})."
+        # an object belongs to the domains of its type and of all its supertypes.
+        _facts = []
+        for t in self.asp_type.ancestors():
+            _facts.append(f"has({str(self.asp_constant)}, {str(t)}).")
+            _facts.append(f"{t.domain(self.asp_constant)}.")
+        return '\n'.join(_facts)
     
     def __hash__(self):
         return hash(str(self))
@@ -148,7 +183,7 @@ class ASPFluent:
         self._arity_types = list(map(lambda a: (a.name.upper(), ASPType(a.type)), f.signature))
         self._head = f"\"{f.name}\"," + ','.join(a[0] for a in self._arity_types) if len(self._arity_types) > 0 else f"\"{f.name}\""
         self._head = f"variable(({self._head}))"
-        self._body = ', '.join(f'has({a}, {str(t)})' for a, t in self._arity_types)
+        self._body = ', '.join(t.domain(a) for a, t in self._arity_types)
         
     def __str__(self):
         return f"variable({self._head})." if len(self._body) == 0 else f"variable({self._head}) :- {self._body}."
@@ -164,7 +199,7 @@ class ASPExpr:
         self.up_expr = f
         self._arity_types = list(map(lambda a: (str(a).upper(), ASPType(a.type)), f.args))
         self._head = f"\"{f._content.payload.name}\"," + ','.join(a[0] for a in self._arity_types) if len(self._arity_types) > 0 else f"\"{f._content.payload.name}\""
-        self._body = ', '.join(f'has({a}, {str(t)})' for a, t in self._arity_types)
+        self._body = ', '.join(t.domain(a) for a, t in self._arity_types)
         self.value   = value
         
     def __str__(self):
@@ -192,13 +227,29 @@ class ASPGroundedFluent:
     def __eq__(self, value):
         return str(self) == str(value)
 
+class ASPGroundedAction:
+    def __init__(self, a, params):
+        self.up_action = a
+        self._arity = list(map(lambda e: ASPConstant(e), params))
+        self._head = f"\"{a.name}\""
+        
+    def __str__(self):
+        _ret_str = f"{self._head}," + ','.join(str(a) for a in self._arity) if len(self._arity) > 0 else f"{self._head}"
+        return f'action(({_ret_str}))'
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    def __eq__(self, value):
+        return str(self) == str(value)
+
 class ASPAction:
     def __init__(self, a):
         self.up_action = a
         self.signature = list(map(lambda p: (p.name.upper(), ASPType(p.type)), a.parameters))
         self._head = f"\"{a.name}\"," + ','.join(p[0] for p in self.signature) if len(self.signature) > 0 else f"\"{a.name}\""
         self._head = f"action(({self._head}))"
-        self._sig_body = ', '.join(f'has({p[0]}, {str(p[1])})' for p in self.signature)
+        self._sig_body = ', '.join(p[1].domain(p[0]) for p in self.signature)
         
 
         # iterate over the preconditions.
@@ -210,7 +261,7 @@ class ASPAction:
                 head = f'precondition({self._head}, {str(variable)}, value({str(variable)}, {variable.value}))'
                 body = [f"action({self._head})"]
                 for argname, argtype in variable._arity_types:
-                    body.append(f"has({argname}, {str(argtype)})")
+                    body.append(argtype.domain(argname))
                 body = ', '.join(body)
                 self._preconditions.append(f"{head} :- {body}.")
 
@@ -223,7 +274,7 @@ class ASPAction:
             head = f"postcondition({self._head}, effect(unconditional), {str(variable)}, value({str(variable)}, {_val}))"
             body = [f"action({self._head})"]
             for argname, argtype in variable._arity_types:
-                body.append(f"has({argname}, {str(argtype)})")
+                body.append(argtype.domain(argname))
             body = ', '.join(body)
             self._postconditions.append(f"{head} :- {body}.")
 
@@ -241,6 +292,54 @@ class ASPAction:
     def __eq__(self, value):
         return str(self) == str(value)
 
+class ASPGroundedActionFacts:
+    def __init__(self, grounded_action):
+        # a GroundedAction: the same facts ASPAction derives, for a single instantiation.
+        self.grounded_action = grounded_action
+        self._head = grounded_action.name
+
+    def __str__(self):
+        _facts  = [f"action({self._head})."]
+        _facts += [f"precondition({self._head}, {f}, value({f}, {str(v).lower()}))." for f, v in self.grounded_action.pre]
+        _facts += [f"postcondition({self._head}, effect(unconditional), {f}, value({f}, {str(v).lower()}))." for f, v in self.grounded_action.effects]
+        return '\n'.join(_facts)
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    def __eq__(self, value):
+        return str(self) == str(value)
+
+class ASPGroundedVariable:
+    def __init__(self, fact):
+        self.fact = fact
+        
+    def __str__(self):
+        return f"variable({self.fact})."
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    def __eq__(self, value):
+        return str(self) == str(value)
+
+class ASPActionCost:
+    def __init__(self, a, cost):
+        self.up_action = a
+        self.cost = cost
+        self._signature = list(map(lambda p: (p.name.upper(), ASPType(p.type)), a.parameters))
+        self._head = f"\"{a.name}\"," + ','.join(p[0] for p in self._signature) if len(self._signature) > 0 else f"\"{a.name}\""
+        self._head = f"action(({self._head}))"
+
+    def __str__(self):
+        return f"cost({self._head}, {self.cost}) :- action({self._head})."
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    def __eq__(self, value):
+        return str(self) == str(value)
+
 class ASPStateVarVal:
     def __init__(self, fluent, value):
         self.fluent = ASPGroundedFluent(fluent)
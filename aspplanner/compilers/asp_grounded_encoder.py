@@ -0,0 +1,44 @@
+"""This module defines the grounded ASP encoder: the lifted encoding with the actions grounded in Python."""
+
+from unified_planning.engines.results import CompilerResult
+
+from aspplanner.compilers.asp_seq_encoder import ASPSeqEncoder
+from aspplanner.compilers.grounded_task import GroundedTask
+from aspplanner.compilers.asp_facts import ASPGroundedActionFacts, ASPGroundedVariable
+
+
+class ASPGroundedEncoder(ASPSeqEncoder):
+    """
+    Emits the `action`, `precondition`, `postcondition` and `variable` facts of the
+    relaxed reachable ground actions instead of the lifted rules, so gringo does not
+    join `has/2` for every schema parameter. Instantiations with false static
+    preconditions and actions that can never be applied do not reach the program.
+
+    The compiled problem has a `grounded_actions` attribute with the number of ground
+    actions per schema, which the grounding estimator uses instead of the type sizes.
+    """
+
+    @property
+    def name(self):
+        return "aspgroundedencoder"
+
+    def _compile(self, problem, compilation_kind):
+        return self.ground(super()._compile(problem, compilation_kind))
+
+    def ground(self, result: CompilerResult) -> CompilerResult:
+        """Replaces the lifted actions and variables of an ASPSeqEncoder result by their reachable groundings."""
+        task    = result.problem
+        actions = self.__ground_actions__(task, GroundedTask(task))
+        facts   = set(f for a in actions for f, _ in a.pre + a.effects)
+        facts  |= set(str(s.fluent) for s in task.asp_encoding['_initial_state'] | task.asp_encoding['_goal_state'])
+
+        task.asp_encoding['_actions']   = set(ASPGroundedActionFacts(a) for a in actions)
+        task.asp_encoding['_variables'] = set(ASPGroundedVariable(f) for f in facts)
+        setattr(task, 'grounded_actions', {a.name: 0 for a in task.actions})
+        for a in actions: task.grounded_actions[a.lifted.name] += 1
+        self.__encoding_strings__(task)
+        return result
+
+    def __ground_actions__(self, task, grounded):
+        # the ground actions the program is made of.
+        return grounded.relaxed_reachable_actions()
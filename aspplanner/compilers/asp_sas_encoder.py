@@ -0,0 +1,24 @@
+"""This module defines the SAS+ ASP encoder: the lifted encoding with mutex groups as multi-valued variables."""
+
+from aspplanner.compilers.asp_seq_encoder import ASPSeqEncoder
+from aspplanner.compilers.mutex_groups import MutexGroups
+
+
+class ASPSasEncoder(ASPSeqEncoder):
+    """
+    Adds the `member(Group, Variable)` rules of the synthesised mutex groups to the
+    lifted encoding. The 'sas' encoding keeps a single frame axiom per group and
+    step instead of one per fluent atom and value, and the false values of grouped
+    fluents are never represented.
+    """
+
+    @property
+    def name(self):
+        return "aspsasencoder"
+
+    def _compile(self, problem, compilation_kind):
+        result = super()._compile(problem, compilation_kind)
+        task   = result.problem
+        task.asp_encoding['_groups'] = MutexGroups(task).asp_encoding()
+        self.__encoding_strings__(task)
+        return result
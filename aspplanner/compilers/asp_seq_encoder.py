@@ -12,6 +12,7 @@ from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_V
 from unified_planning.engines.compilers.utils import replace_action
 from unified_planning.shortcuts import OperatorKind, InstantaneousAction, FNode, Fluent, And
 from unified_planning.model.walkers.names_extractor import NamesExtractor
+from unified_planning.model.metrics import MinimizeActionCosts
 from unified_planning.engines.compilers.quantifiers_remover import QuantifiersRemover
 from unified_planning.engines.compilers.disjunctive_conditions_remover import DisjunctiveConditionsRemover
 
@@ -21,19 +22,25 @@ from unified_planning.model import (
     Action,
 )
 
+from math import lcm
+from fractions import Fraction
 from typing import Optional, Dict
 from functools import partial
 
 from aspplanner.compilers.delete_then_set_remover import DeleteThenSetRemover
 from aspplanner.compilers.renamer import Renamer
+from aspplanner.compilers.landmarks import LandmarkExtractor
+from aspplanner.compilers.move_pruning import MovePruning
 
 from aspplanner.compilers.asp_facts import (
     ASPType,
     ASPBooleanType,
     ASPConstant,
     ASPHasConstant,
+    ASPTypeDomain,
     ASPFluent,
     ASPAction,
+    ASPActionCost,
     ASPInitialState,
     ASPGoalState
 )
@@ -44,9 +51,11 @@ class ASPSeqEncoder(engines.engine.Engine, CompilerMixin):
     This is a recreation of the PLASP tool
     """
 
-    def __init__(self):
+    def __init__(self, landmarks=False, move_pruning=False):
         engines.engine.Engine.__init__(self)
         CompilerMixin.__init__(self, CompilationKind.GROUNDING)
+        self.landmarks  = landmarks
+        self.move_pruning = move_pruning
         self.fluent_map = defaultdict(str)
         self.fluent_map_args = defaultdict(dict)
 
@@ -144,36 +153,57 @@ class ASPSeqEncoder(engines.engine.Engine, CompilerMixin):
         new_problem = original_problem.clone()
         new_problem.name = f"{self.name}_{problem.name}"
 
-        setattr(new_problem, 'asp_encoding',     {})
-        setattr(new_problem, 'asp_encoding_str', {})
+        setattr(new_problem, 'asp_encoding',        {})
+        setattr(new_problem, 'asp_encoding_str',    {})
+        setattr(new_problem, 'horizon_lower_bound', 0)
+        setattr(new_problem, 'action_costs',        None)
+        setattr(new_problem, 'action_cost_scale',   1)
 
         new_problem.asp_encoding['_types']          = set(ASPType(t) for t in original_problem.user_types)
         new_problem.asp_encoding['_default_values'] = set(ASPBooleanType(v) for v in [True, False])
         new_problem.asp_encoding['_constants']      = set(ASPConstant(obj) for obj in original_problem.all_objects)
-        new_problem.asp_encoding['_has']            = set(ASPHasConstant(obj) for obj in original_problem.all_objects)
+        new_problem.asp_encoding['_has']            = set(ASPHasConstant(obj) for obj in original_problem.all_objects) | set(ASPTypeDomain(t) for t in original_problem.user_types)
         new_problem.asp_encoding['_variables']      = set(ASPFluent(fluent) for fluent in original_problem.fluents)
         new_problem.asp_encoding['_actions']        = set(ASPAction(action) for action in original_problem.actions)
         new_problem.asp_encoding['_initial_state']  = set(ASPInitialState(fluent, value) for fluent, value in original_problem.initial_values.items() if not value.is_false())
         new_problem.asp_encoding['_goal_state']     = set(chain.from_iterable(self.__generate_asp_goal_state__(g) for g in original_problem.goals))
         
+        # Integer action costs, only used by the anytime mode (see ASPPlanner.anytime_plans).
+        new_problem.action_costs, new_problem.action_cost_scale = self.__action_costs__(original_problem)
+        new_problem.asp_encoding['_costs'] = set() if new_problem.action_costs is None else set(ASPActionCost(a, new_problem.action_costs[a.name]) for a in original_problem.actions)
+
         # This is a corner case where the initial state has no true fluents. In this case we need to add all the fluents of the problem.
         if len(new_problem.asp_encoding['_initial_state']) == 0:
             new_problem.asp_encoding['_initial_state'] = set(ASPInitialState(fluent, value) for fluent, value in original_problem.initial_values.items())
 
-        for k, v in new_problem.asp_encoding.items():
-            if 'constant' in k: new_problem.asp_encoding_str[k] = set(f'constant({e})' for e in chain.from_iterable(str(s).split('\n') for s in v))
-            elif 'type' in k: new_problem.asp_encoding_str[k] = set(f'type({e})' for e in chain.from_iterable(str(s).split('\n') for s in v))
-            elif 'default_values' in k: new_problem.asp_encoding_str[k] = set(f'{e}.' for e in chain.from_iterable(str(s).split('\n') for s in v))
-            else: new_problem.asp_encoding_str[k] = set(chain.from_iterable(str(s).split('\n') for s in v))
-        
-        # now check if every entry ends with a dot.
-        for k, v in new_problem.asp_encoding_str.items():
-            new_problem.asp_encoding_str[k] = set(line if line.strip().endswith('.') else line.strip() + '.' for line in v)
+        # Redundant landmark constraints prune short horizons and bound the first horizon worth trying.
+        if self.landmarks:
+            extractor = LandmarkExtractor(original_problem)
+            new_problem.asp_encoding['_landmarks'] = extractor.asp_encoding()
+            new_problem.horizon_lower_bound        = extractor.horizon_lower_bound()
+
+        # Constraints against consecutive action pairs that undo, repeat or needlessly reorder each other.
+        if self.move_pruning:
+            new_problem.asp_encoding['_move_pruning'] = MovePruning(original_problem, commuting=self.move_pruning == 'commuting').asp_encoding()
+
+        self.__encoding_strings__(new_problem)
 
         return CompilerResult(
             new_problem, partial(replace_action, map={a: a for a in original_problem.actions}), self.name
         )
     
+    def __encoding_strings__(self, problem):
+        # renders asp_encoding into the program lines of asp_encoding_str.
+        for k, v in problem.asp_encoding.items():
+            if 'constant' in k: problem.asp_encoding_str[k] = set(f'constant({e})' for e in chain.from_iterable(str(s).split('\n') for s in v))
+            elif 'type' in k: problem.asp_encoding_str[k] = set(f'type({e})' for e in chain.from_iterable(str(s).split('\n') for s in v))
+            elif 'default_values' in k: problem.asp_encoding_str[k] = set(f'{e}.' for e in chain.from_iterable(str(s).split('\n') for s in v))
+            else: problem.asp_encoding_str[k] = set(chain.from_iterable(str(s).split('\n') for s in v))
+        
+        # now check if every entry ends with a dot.
+        for k, v in problem.asp_encoding_str.items():
+            problem.asp_encoding_str[k] = set(line if line.strip().endswith('.') else line.strip() + '.' for line in v)
+
     def __resolve_actions_preconditions__(self, problem: Problem):
 
         for idx, action in enumerate(problem.actions):
@@ -182,6 +212,34 @@ class ASPSeqEncoder(engines.engine.Engine, CompilerMixin):
             problem.actions[idx].clear_preconditions()
             problem.actions[idx].add_precondition(_expr)
 
+        # the actions changed in place, so the action costs that are keyed by them need rehashing.
+        metrics = problem.quality_metrics[:]
+        problem.clear_quality_metrics()
+        for metric in metrics:
+            if metric.is_minimize_action_costs():
+                metric = MinimizeActionCosts(dict(metric.costs), metric.default, environment=problem.environment)
+            problem.add_quality_metric(metric)
+
+    def __action_costs__(self, problem: Problem):
+        """
+        Returns the costs of the actions under the MinimizeActionCosts metric as integers,
+        together with the factor real costs were scaled by. Costs that depend on fluents are
+        not supported, in which case (or without such a metric) there are no costs.
+        """
+        metric = next((m for m in problem.quality_metrics if m.is_minimize_action_costs()), None)
+        if metric is None: return None, 1
+        costs = {}
+        for action in problem.actions:
+            cost = metric.get_action_cost(action)
+            if cost is None:
+                costs[action.name] = Fraction(0)
+                continue
+            cost = cost.simplify()
+            if not (cost.is_int_constant() or cost.is_real_constant()): return None, 1
+            costs[action.name] = Fraction(cost.constant_value())
+        scale = lcm(*(c.denominator for c in costs.values())) if len(costs) > 0 else 1
+        return {name: int(cost * scale) for name, cost in costs.items()}, scale
+
     def __generate_asp_goal_state__(self, goal_state):
         goal_predicates = [goal_state] if goal_state.node_type != OperatorKind.AND else goal_state.args
         ret_goals = []
@@ -0,0 +1,39 @@
+"""This module defines the windowed ASP encoder: the grounded encoding with the steps each action and value can matter at."""
+
+from aspplanner.compilers.asp_grounded_encoder import ASPGroundedEncoder
+
+
+class ASPWindowEncoder(ASPGroundedEncoder):
+    """
+    Adds time windows to the ground actions and fluent values of the grounded encoder.
+
+    An action can occur no earlier than one step after all of its preconditions are
+    reachable in the delete relaxed planning graph (`earliest(Action, E)`), and no later
+    than `horizon - D` where D is its distance from the goal (`distance(Action, D)`):
+    in a plan without redundant actions every action sets a value that a later action or
+    the goal reads, so at least D steps follow it. The value of a fluent is only carried
+    over while some later step can still read it (`distance(Variable, Value, D)`); its
+    earliest step follows from the windows of the actions that set it.
+
+    The shortest plan has no redundant actions, so the horizon search still finds it.
+    Longer horizons only have the plans of exactly that length without redundant actions,
+    and actions that no goal depends on are left out.
+    """
+
+    @property
+    def name(self):
+        return "aspwindowencoder"
+
+    def __ground_actions__(self, task, grounded):
+        levels = grounded.relaxed_literal_levels()
+        literal_distances, action_distances = grounded.goal_distances()
+        actions = [a for a in grounded.actions if a.name in action_distances and all(l in levels for l in a.pre)]
+
+        windows = set()
+        for a in actions:
+            windows.add(f"earliest({a.name}, {1 + max((levels[l] for l in a.pre), default=0)}).")
+            windows.add(f"distance({a.name}, {action_distances[a.name]}).")
+        for (f, v), d in literal_distances.items():
+            windows.add(f"distance({f}, value({f}, {str(v).lower()}), {d}).")
+        task.asp_encoding['_windows'] = windows
+        return actions
@@ -5,7 +5,7 @@ import unified_planning.engines as engines
 from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
 from unified_planning.engines.results import CompilerResult
 from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
-from unified_planning.engines.compilers.utils import replace_action
+from unified_planning.engines.compilers.utils import replace_action, updated_minimize_action_costs
 from unified_planning.shortcuts import EffectKind
 
 from unified_planning.model import (
@@ -141,6 +141,14 @@ class DeleteThenSetRemover(engines.engine.Engine, CompilerMixin):
             new_problem.add_action(fixed_action)
             new_to_old[fixed_action] = a
 
+        # the cloned metrics still refer to the old actions.
+        new_problem.clear_quality_metrics()
+        for metric in problem.quality_metrics:
+            if metric.is_minimize_action_costs():
+                new_problem.add_quality_metric(updated_minimize_action_costs(metric, new_to_old, env))
+            else:
+                new_problem.add_quality_metric(metric)
+
         return CompilerResult(
             new_problem, partial(replace_action, map=new_to_old), self.name
         )
@@ -0,0 +1,186 @@
+"""This module defines a grounded, boolean STRIPS view of a compiled task.
+
+The analyses that run over the compiled task (landmarks, reachability, ...) work on
+ground facts and actions. Facts are named by their ASP variable term, e.g.
+`variable(("at",constant("ball0"),constant("rooma")))`, and actions by their ASP action
+term, so anything derived here can be emitted straight into the ASP program.
+"""
+
+from unified_planning.engines.compilers.grounder import GrounderHelper
+
+from aspplanner.compilers.asp_facts import ASPGroundedFluent, ASPGroundedAction
+
+
+def literals(expr):
+    """Flattens a conjunction of (negated) boolean fluents into a list of (fluent, value) pairs."""
+    if expr.is_and():
+        return [l for arg in expr.args for l in literals(arg)]
+    if expr.is_not() and expr.args[0].is_fluent_exp():
+        return [(expr.args[0], False)]
+    if expr.is_fluent_exp():
+        return [(expr, True)]
+    if expr.is_bool_constant():
+        return []
+    raise TypeError(f"Unsupported condition in grounded task: {expr}")
+
+
+def parameter_atoms(expressions):
+    """
+    (fluent name, parameter names, value) triples of lifted (fluent, value) pairs, or None
+    if an argument is not an action parameter.
+    """
+    atoms = []
+    for fluent, value in expressions:
+        if not all(arg.is_parameter_exp() for arg in fluent.args): return None
+        atoms.append((fluent.fluent().name, tuple(arg.parameter().name for arg in fluent.args), value))
+    return atoms
+
+
+class GroundedAction:
+    def __init__(self, lifted, params, grounded):
+        self.lifted  = lifted
+        self.params  = tuple(p.object() if p.is_object_exp() else p for p in params)
+        self.name    = str(ASPGroundedAction(lifted, self.params))
+        self.pre     = [(str(ASPGroundedFluent(f)), v) for p in grounded.preconditions for f, v in literals(p)]
+        self.effects = [(str(ASPGroundedFluent(e.fluent)), e.value.is_true()) for e in grounded.unconditional_effects]
+        # delete-then-set effects were removed before, so a fact is either added or deleted.
+        self.add     = set(f for f, v in self.effects if v)
+        self.delete  = set(f for f, v in self.effects if not v)
+        self.pos_pre = set(f for f, v in self.pre if v)
+
+    def __str__(self):
+        return self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __eq__(self, value):
+        return str(self) == str(value)
+
+
+class GroundedTask:
+    """
+    Ground actions, initial facts and goal literals of a compiled task.
+
+    Actions are grounded with UP's grounder helper, which already drops the
+    instantiations whose static preconditions are false.
+    """
+
+    def __init__(self, problem):
+        self.problem   = problem
+        self.variables = set(str(ASPGroundedFluent(f)) for f in problem.initial_values.keys())
+        self.init      = set(str(ASPGroundedFluent(f)) for f, v in problem.initial_values.items() if v.is_true())
+        self.goals     = [(str(ASPGroundedFluent(f)), v) for g in problem.goals for f, v in literals(g)]
+        self.actions   = []
+        for lifted, params, grounded in GrounderHelper(problem).get_grounded_actions():
+            if grounded is None: continue
+            self.actions.append(GroundedAction(lifted, params, grounded))
+
+    def relaxed_reachable(self, excluded=frozenset()):
+        """Facts reachable under the delete relaxation without applying the `excluded` actions."""
+        reached = set(self.init)
+        pending = [a for a in self.actions if a not in excluded]
+        changed = True
+        while changed:
+            changed = False
+            remaining = []
+            for a in pending:
+                if a.pos_pre <= reached:
+                    if not a.add <= reached:
+                        reached |= a.add
+                        changed = True
+                else:
+                    remaining.append(a)
+            pending = remaining
+        return reached
+
+    def relaxed_reachable_actions(self):
+        """
+        The actions applicable under the delete relaxation from the initial state. With NumPy
+        the fixpoint is computed over arrays: each round applies every action whose
+        preconditions are all reached, until no new action becomes applicable.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            reached = self.relaxed_reachable()
+            return [a for a in self.actions if a.pos_pre <= reached]
+
+        facts = {f: i for i, f in enumerate(set(self.init).union(*(a.pos_pre | a.add for a in self.actions)))}
+        pre_count = np.array([len(a.pos_pre) for a in self.actions], dtype=np.int64)
+        add_count = np.array([len(a.add) for a in self.actions], dtype=np.int64)
+        pre_facts = np.array([facts[f] for a in self.actions for f in a.pos_pre], dtype=np.int64)
+        add_facts = np.array([facts[f] for a in self.actions for f in a.add], dtype=np.int64)
+        pre_owner = np.repeat(np.arange(len(self.actions)), pre_count)
+        add_owner = np.repeat(np.arange(len(self.actions)), add_count)
+
+        reached    = np.zeros(len(facts), dtype=bool)
+        reached[[facts[f] for f in self.init]] = True
+        applicable = np.zeros(len(self.actions), dtype=bool)
+        while True:
+            missing = np.bincount(pre_owner, weights=~reached[pre_facts], minlength=len(self.actions))
+            new     = (missing == 0) & ~applicable
+            if not new.any(): break
+            applicable |= new
+            reached[add_facts[new[add_owner]]] = True
+        return [a for a, ok in zip(self.actions, applicable) if ok]
+
+    def relaxed_levels(self):
+        """First layer of the delete relaxed planning graph at which each reachable fact holds."""
+        levels  = {f: 0 for f in self.init}
+        pending = list(self.actions)
+        layer   = 0
+        while True:
+            layer += 1
+            applicable = [a for a in pending if a.pos_pre <= levels.keys()]
+            new_facts  = set(f for a in applicable for f in a.add if f not in levels)
+            if len(new_facts) == 0: return levels
+            for f in new_facts: levels[f] = layer
+            pending = [a for a in pending if a not in applicable]
+
+    def relaxed_literal_levels(self):
+        """
+        First layer of the delete relaxed planning graph at which each reachable literal
+        (fact, value) holds. Unlike `relaxed_levels` false values count too, so negative
+        preconditions are only met once something deletes the fact.
+        """
+        levels  = {(f, f in self.init): 0 for f in self.variables}
+        pending = list(self.actions)
+        layer   = 0
+        while True:
+            layer += 1
+            applicable = [a for a in pending if all(l in levels for l in a.pre)]
+            new_literals = set(l for a in applicable for l in a.effects if l not in levels)
+            if len(new_literals) == 0: return levels
+            for l in new_literals: levels[l] = layer
+            pending = [a for a in pending if a not in applicable]
+
+    def goal_distances(self):
+        """
+        The fewest steps that follow each literal (fact, value) and action in a plan without
+        redundant actions: 0 for the goal literals, d for an action that sets a literal at
+        distance d, and d + 1 for the preconditions of an action at distance d. Actions are
+        keyed by name. What no goal depends on is missing, such an action only occurs in
+        plans that stay valid without it.
+        """
+        setters = {}
+        for a in self.actions:
+            for l in a.effects: setters.setdefault(l, []).append(a)
+        literal_distances = {l: 0 for l in self.goals}
+        action_distances  = {}
+        frontier, depth   = list(literal_distances), 0
+        while len(frontier) > 0:
+            reached = []
+            for l in frontier:
+                for a in setters.get(l, []):
+                    if a.name in action_distances: continue
+                    action_distances[a.name] = depth
+                    for p in a.pre:
+                        if p in literal_distances: continue
+                        literal_distances[p] = depth + 1
+                        reached.append(p)
+            frontier, depth = reached, depth + 1
+        return literal_distances, action_distances
+
+    def achievers(self, fact):
+        return [a for a in self.actions if fact in a.add]
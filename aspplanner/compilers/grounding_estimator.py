@@ -0,0 +1,120 @@
+"""This module predicts the size of the ground program of a compiled task before it is grounded.
+
+The lifted encoding instantiates every action schema with all objects of its parameter
+types, so the ground program grows with the product of the type sizes. The estimate
+counts, per schema and per horizon step, the `occurs`, `precondition`, `postcondition`
+and `caused` instances the encoding produces, and per fluent the `holds` atoms and
+inertia rules. The numbers follow gringo's statistics within a small factor (gringo adds
+auxiliary atoms and simplifies others away), which is enough to stop a grounding that is
+orders of magnitude too large.
+"""
+
+from math import prod
+
+from aspplanner.compilers.grounded_task import literals
+
+
+class GroundingLimitExceeded(MemoryError):
+    """The estimated ground program is larger than the configured limits; the message is the report."""
+
+
+class SchemaEstimate:
+    def __init__(self, name, groundings, preconditions, effects, selectivity):
+        self.name          = name
+        self.groundings    = groundings
+        self.preconditions = preconditions
+        self.effects       = effects
+        # fraction of the groundings whose static preconditions hold initially.
+        self.selectivity   = selectivity
+
+    @property
+    def applicable(self):
+        return int(self.groundings * self.selectivity)
+
+    def atoms(self, horizon):
+        # action/1, precondition/3 and postcondition/4 facts, then occurs/2 and caused/3 per step.
+        return self.groundings * (1 + self.preconditions + self.effects) + horizon * self.groundings * (1 + self.effects)
+
+    def rules(self, horizon):
+        # the precondition constraints and the effect rules per step.
+        return self.groundings * (1 + self.preconditions + self.effects) + horizon * self.groundings * (self.preconditions + self.effects)
+
+
+class GroundingEstimator:
+    """
+    Ground program size of a compiled task from its object counts per type, the action
+    arities and the selectivity of the static fluents in the initial state.
+
+    A static fluent is one no action changes. Its selectivity is the fraction of its
+    groundings that are true initially, and a schema's static preconditions scale the
+    number of its groundings that can ever be applied. The encoding does not prune the
+    other groundings at grounding time, so the selectivity is reported, not subtracted.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        changed      = set(e.fluent.fluent() for a in problem.actions for e in a.effects)
+        true_counts  = {}
+        for fluent, value in problem.initial_values.items():
+            if value.is_true(): true_counts[fluent.fluent()] = true_counts.get(fluent.fluent(), 0) + 1
+
+        self.variables = {}
+        self.static    = {}
+        for fluent in problem.fluents:
+            count = self.__groundings__(p.type for p in fluent.signature)
+            self.variables[fluent.name] = count
+            if fluent not in changed:
+                self.static[fluent] = true_counts.get(fluent, 0) / count if count > 0 else 0.0
+
+        self.schemas = [self.__schema__(action) for action in problem.actions]
+        # fluent variables per step: holds/3 for both values and modified/2 of the dynamic ones,
+        # static ones only ever hold their initial value.
+        self.per_step = int(sum(3 * v for f, v in self.variables.items() if self.problem.fluent(f) not in self.static)
+                            + sum(self.variables[f.name] * r for f, r in self.static.items()))
+
+    def __groundings__(self, types):
+        return prod(len(list(self.problem.objects(t))) for t in types)
+
+    def __schema__(self, action):
+        try:
+            pre = [l for p in action.preconditions for l in literals(p)]
+        except TypeError:
+            # conditions the estimator cannot split (e.g. equalities) still give one fact each.
+            pre = [(None, True)] * len(action.preconditions)
+        grounded = getattr(self.problem, 'grounded_actions', None)
+        if grounded is not None:
+            # the grounded encoding only emits the reachable instantiations.
+            return SchemaEstimate(action.name, grounded.get(action.name, 0), len(pre), len(action.effects), 1.0)
+        selectivity = 1.0
+        for fluent, value in pre:
+            if fluent is None or fluent.fluent() not in self.static: continue
+            ratio = self.static[fluent.fluent()]
+            selectivity *= ratio if value else 1.0 - ratio
+        return SchemaEstimate(action.name, self.__groundings__(p.type for p in action.parameters), len(pre), len(action.effects), selectivity)
+
+    def atoms(self, horizon):
+        # variable/1 and contains/2 of every fluent variable, then the fluent atoms of every step.
+        return sum(s.atoms(horizon) for s in self.schemas) + 3 * sum(self.variables.values()) + (horizon + 1) * self.per_step
+
+    def rules(self, horizon):
+        # the choice rule and the inertia rules of every step.
+        return sum(s.rules(horizon) for s in self.schemas) + 3 * sum(self.variables.values()) + horizon * (self.per_step + 1)
+
+    def report(self, horizon, limit=10):
+        """A table of the largest schemas at the given horizon, largest first."""
+        lines   = [f'Estimated ground program at horizon {horizon}: {self.atoms(horizon)} atoms, {self.rules(horizon)} rules.']
+        lines  += [f"  {'schema':30} {'groundings':>12} {'applicable':>12} {'atoms':>14} {'rules':>14}"]
+        largest = sorted(self.schemas, key=lambda s: -s.rules(horizon))[:limit]
+        for s in largest:
+            lines.append(f'  {s.name:30} {s.groundings:12} {s.applicable:12} {s.atoms(horizon):14} {s.rules(horizon):14}')
+        return '\n'.join(lines)
+
+    def check(self, horizon, max_atoms=None, max_rules=None):
+        """Raises GroundingLimitExceeded, with the report, if the estimate at the horizon exceeds a limit."""
+        exceeded = []
+        if max_atoms is not None and self.atoms(horizon) > max_atoms: exceeded.append(f'more than {max_atoms} atoms')
+        if max_rules is not None and self.rules(horizon) > max_rules: exceeded.append(f'more than {max_rules} rules')
+        if len(exceeded) == 0: return
+        largest = max(self.schemas, key=lambda s: s.rules(horizon), default=None)
+        blame   = '' if largest is None else f" The largest schema is '{largest.name}' with {largest.groundings} groundings."
+        raise GroundingLimitExceeded(f"The ground program would have {' and '.join(exceeded)}.{blame}\n{self.report(horizon)}")
@@ -0,0 +1,94 @@
+"""This module extracts fact landmarks and their orderings from a compiled task."""
+
+from collections import deque, defaultdict
+
+from aspplanner.compilers.grounded_task import GroundedTask
+
+
+class LandmarkExtractor:
+    """
+    Backchaining fact landmark extraction in the spirit of LM-RHW.
+
+    Every goal fact is a landmark. For a landmark L that is false initially, the
+    shared preconditions of all actions that can first achieve L (i.e. that are
+    relaxed reachable without achieving L) are landmarks too, and they are
+    greedy-necessarily ordered before L. Only positive facts are considered, which
+    keeps the analysis sound under the delete relaxation.
+
+    The landmarks are turned into redundant constraints: every landmark must hold at
+    some step, and an ordered landmark L1 -> L2 must have held before L2 first holds.
+    The longest chain of orderings is a lower bound on the horizon.
+    """
+
+    def __init__(self, problem):
+        self.task      = GroundedTask(problem)
+        self.landmarks = set()
+        self.orderings = set()
+        self.__extract__()
+
+    def __extract__(self):
+        queue = deque(f for f, v in self.task.goals if v)
+        self.landmarks.update(queue)
+        while queue:
+            landmark = queue.popleft()
+            if landmark in self.task.init: continue
+            achievers = self.task.achievers(landmark)
+            possibly_before = self.task.relaxed_reachable(frozenset(achievers))
+            first_achievers = [a for a in achievers if a.pos_pre <= possibly_before]
+            # no first achiever: the task is unsolvable, which the solver will tell us anyway.
+            if len(first_achievers) == 0: continue
+            for fact in set.intersection(*(a.pos_pre for a in first_achievers)):
+                if fact in self.task.init or fact == landmark: continue
+                self.orderings.add((fact, landmark))
+                if fact not in self.landmarks:
+                    self.landmarks.add(fact)
+                    queue.append(fact)
+
+    def horizon_lower_bound(self):
+        """Length of the longest ordering chain over landmarks that are false initially."""
+        successors = defaultdict(set)
+        for before, after in self.orderings: successors[before].add(after)
+        depth = {}
+
+        def _depth(fact, visiting):
+            if fact in depth: return depth[fact]
+            if fact in visiting: return 0 # cycles only occur in unsolvable tasks.
+            visiting.add(fact)
+            depth[fact] = 1 + max((_depth(s, visiting) for s in successors[fact]), default=0)
+            visiting.discard(fact)
+            return depth[fact]
+
+        return max((_depth(l, set()) for l in self.landmarks if l not in self.task.init), default=0)
+
+    def ordering_depths(self):
+        """Length of the longest ordering chain that ends in each landmark."""
+        predecessors = defaultdict(set)
+        for before, after in self.orderings: predecessors[after].add(before)
+        depth = {}
+
+        def _depth(fact, visiting):
+            if fact in depth: return depth[fact]
+            if fact in visiting: return 0
+            visiting.add(fact)
+            depth[fact] = max((1 + _depth(p, visiting) for p in predecessors[fact]), default=0)
+            visiting.discard(fact)
+            return depth[fact]
+
+        return {l: _depth(l, set()) for l in self.landmarks}
+
+    def asp_encoding(self):
+        rules = set()
+        for fact in self.landmarks:
+            if fact in self.task.init: continue
+            rules.add(f"landmark({fact}, value({fact}, true)).")
+        for before, after in self.orderings:
+            rules.add(f"landmarkOrder({before}, value({before}, true), {after}, value({after}, true)).")
+        if len(rules) == 0: return rules
+        # either may have no facts, e.g. landmarks without orderings.
+        rules.add("#defined landmark/2.")
+        rules.add("#defined landmarkOrder/4.")
+        rules.add("reachedBy(Variable, Value, T) :- landmark(Variable, Value), holds(Variable, Value, T).")
+        rules.add("reachedBy(Variable, Value, T) :- reachedBy(Variable, Value, T - 1), time(T).")
+        rules.add(":- landmark(Variable, Value), not reachedBy(Variable, Value, horizon).")
+        rules.add(":- landmarkOrder(VariablePre, ValuePre, Variable, Value), holds(Variable, Value, T), T > 0, not reachedBy(VariablePre, ValuePre, T - 1).")
+        return rules
@@ -0,0 +1,247 @@
+"""This module learns macro actions from solved plans and compiles them into problems.
+
+A macro is a sequence of actions whose parameters are bound to the macro's own
+parameters, e.g. `pick(?0, ?1, ?2); move(?1, ?3)`. Macros are mined from validated
+plans, stored per domain in a JSON library, and added to a problem as plain
+instantaneous actions before it is encoded. A plan that uses them is expanded back
+into the primitive actions (see ASPPlanner.__extract_plan__).
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+import unified_planning as up
+import unified_planning.engines as engines
+from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
+from unified_planning.engines.results import CompilerResult
+from unified_planning.engines.compilers.utils import replace_action
+from unified_planning.model.metrics import MinimizeActionCosts
+from unified_planning.shortcuts import InstantaneousAction
+
+from unified_planning.model import (
+    Problem,
+    ProblemKind,
+)
+
+from collections import OrderedDict, defaultdict
+from functools import partial
+
+from aspplanner.compilers.delete_then_set_remover import DeleteThenSetRemover
+from aspplanner.compilers.grounded_task import literals
+
+
+def domain_key(problem):
+    """Identifies the domain of a problem by its fluent signatures, which macros do not change."""
+    signatures = sorted(f"{f.name.replace('-', '_')}({','.join(str(p.type).replace('-', '_') for p in f.signature)})" for f in problem.fluents)
+    return hashlib.sha1(';'.join(signatures).encode()).hexdigest()[:16]
+
+
+class MacroLibrary:
+    """
+    Frequencies of action sequences in the plans solved so far, per domain.
+
+    A sequence is stored as a list of [action name, [parameter indices]] steps, with
+    the names as the compiled task has them ('-' replaced by '_'). Only connected
+    sequences are counted: every step shares an object with the steps before it.
+    """
+
+    def __init__(self, path=None, max_length=2):
+        self.path       = path
+        self.max_length = max_length
+        self.support    = defaultdict(dict)
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as f:
+                self.support.update(json.load(f))
+
+    def save(self):
+        if self.path is None: return
+        # planners of other threads and processes may save the same library at the same time.
+        tmp = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.support, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def learn(self, problem, plan):
+        """Counts the connected subsequences of a (validated) plan."""
+        support = self.support[domain_key(problem)]
+        steps   = [(a.action.name.replace('-', '_'), [str(p).replace('-', '_') for p in a.actual_parameters]) for a in plan.actions]
+        for length in range(2, self.max_length + 1):
+            for start in range(len(steps) - length + 1):
+                macro = self.__pattern__(steps[start:start + length])
+                if macro is None: continue
+                support[macro] = support.get(macro, 0) + 1
+
+    def macros(self, problem, min_support=2):
+        """The sequences seen at least `min_support` times in the problem's domain, most frequent first."""
+        support = self.support.get(domain_key(problem), {})
+        ranked  = sorted((k for k, v in support.items() if v >= min_support), key=lambda k: (-support[k], k))
+        return [json.loads(k) for k in ranked]
+
+    def __pattern__(self, window):
+        objects, pattern = [], []
+        for name, args in window:
+            if len(objects) > 0 and not any(a in objects for a in args): return None
+            for a in args:
+                if a not in objects: objects.append(a)
+            pattern.append([name, [objects.index(a) for a in args]])
+        return json.dumps(pattern)
+
+
+class MacroCompiler(engines.engine.Engine, CompilerMixin):
+    """
+    Adds the macros of a library to a problem as instantaneous actions.
+
+    A macro's precondition is the conjunction of its steps' preconditions that are not
+    established by the steps before; its effects are the last assignment of every
+    fluent. Only macros over actions with conjunctive (negated) boolean preconditions
+    and unconditional effects are composed, and macros that could behave differently
+    when two of their parameters are bound to the same object are skipped.
+
+    Relevance filtering keeps the grounding in check: a macro must change a fluent the
+    goals mention, and all macros together may have at most `grounding_budget` times as
+    many groundings as the primitive actions.
+    The compiled problem has a `macros` attribute mapping macro names to their steps.
+    """
+
+    def __init__(self, library, min_support=2, max_macros=8, grounding_budget=1.0):
+        engines.engine.Engine.__init__(self)
+        CompilerMixin.__init__(self, CompilationKind.GROUNDING)
+        self.library     = library
+        self.min_support = min_support
+        self.max_macros  = max_macros
+        self.grounding_budget = grounding_budget
+
+    @property
+    def name(self):
+        return "macros"
+
+    @staticmethod
+    def supported_kind() -> ProblemKind:
+        # macros over unsupported actions are skipped, so this is as broad as the encoder's input.
+        return DeleteThenSetRemover.supported_kind()
+
+    @staticmethod
+    def supports(problem_kind):
+        return problem_kind <= MacroCompiler.supported_kind()
+
+    @staticmethod
+    def supports_compilation(compilation_kind: CompilationKind) -> bool:
+        return True
+
+    @staticmethod
+    def resulting_problem_kind(
+        problem_kind: ProblemKind,
+        compilation_kind=None
+    ) -> ProblemKind:
+        return problem_kind.clone()
+
+    def _compile(
+        self,
+        problem: "up.model.AbstractProblem",
+        compilation_kind: "up.engines.CompilationKind",
+    ) -> CompilerResult:
+        assert isinstance(problem, Problem)
+        new_problem = problem.clone()
+        new_problem.name = f"{self.name}_{problem.name}"
+        setattr(new_problem, 'macros', {})
+
+        actions     = {a.name.replace('-', '_'): a for a in problem.actions}
+        goal_names  = set(f.fluent().name for g in problem.goals for f, _ in self.__literals__(g))
+        budget      = self.grounding_budget * sum(self.__groundings__(problem, a.parameters) for a in problem.actions)
+        cost_metric = next((m for m in problem.quality_metrics if m.is_minimize_action_costs()), None)
+        costs       = {}
+
+        for steps in self.library.macros(problem, self.min_support):
+            if len(new_problem.macros) >= self.max_macros: break
+            if not all(name in actions for name, _ in steps): continue
+            macro = self.__compose__(problem, [(actions[name], idx) for name, idx in steps])
+            if macro is None: continue
+            if not any(e.fluent.fluent().name in goal_names for e in macro.effects): continue
+            groundings = self.__groundings__(problem, macro.parameters)
+            if groundings > budget: continue
+            if cost_metric is not None:
+                # a macro costs as much as its steps.
+                step_costs = [cost_metric.get_action_cost(actions[name]) for name, _ in steps]
+                if any(c is None or not c.is_constant() for c in step_costs): continue
+                costs[macro] = problem.environment.expression_manager.Plus(step_costs).simplify()
+            budget -= groundings
+            new_problem.add_action(macro)
+            new_problem.macros[macro.name] = [(actions[name].name, idx) for name, idx in steps]
+
+        if len(costs) > 0:
+            new_problem.clear_quality_metrics()
+            for metric in problem.quality_metrics:
+                if metric is cost_metric:
+                    metric = MinimizeActionCosts({**cost_metric.costs, **costs}, cost_metric.default, environment=problem.environment)
+                new_problem.add_quality_metric(metric)
+
+        return CompilerResult(
+            new_problem, partial(replace_action, map={a: a for a in problem.actions}), self.name
+        )
+
+    def __literals__(self, expr):
+        try:
+            return literals(expr)
+        except TypeError:
+            return []
+
+    def __groundings__(self, problem, parameters):
+        count = 1
+        for p in parameters: count *= len(list(problem.objects(p.type)))
+        return count
+
+    def __compose__(self, problem, steps):
+        # the macro parameters take the type of the first action parameter bound to them.
+        types = OrderedDict()
+        for action, idx in steps:
+            if len(action.conditional_effects) > 0 or len(idx) != len(action.parameters): return None
+            for i, p in zip(idx, action.parameters):
+                if i not in types: types[i] = p.type
+                elif not types[i].is_subtype(p.type): return None
+
+        name  = '__'.join(['macro'] + [action.name.replace('-', '_') for action, _ in steps])
+        if problem.has_action(name): return None
+        macro = InstantaneousAction(name, OrderedDict((f'p{i}', t) for i, t in types.items()), _env=problem.environment)
+
+        preconditions = OrderedDict()
+        effects       = OrderedDict()
+        for action, idx in steps:
+            binding = {p: macro.parameter(f'p{i}') for i, p in zip(idx, action.parameters)}
+            step_pre = []
+            for precondition in action.preconditions:
+                try:
+                    step_pre += literals(precondition.substitute(binding))
+                except TypeError:
+                    return None
+            for fluent, value in step_pre:
+                if fluent in effects:
+                    if effects[fluent] != value: return None
+                    continue
+                # an aliased fluent could have been changed by an earlier step.
+                if any(self.__unifiable__(fluent, f) and v != value for f, v in effects.items()): return None
+                if preconditions.get(fluent, value) != value: return None
+                preconditions[fluent] = value
+            step_effects = OrderedDict()
+            for effect in action.unconditional_effects:
+                if not (effect.value.is_bool_constant() and effect.fluent.type.is_bool_type()): return None
+                step_effects[effect.fluent.substitute(binding)] = effect.value.bool_constant_value()
+            if any(self.__unifiable__(fluent, f) and fluent != f and v != value for fluent, value in step_effects.items() for f, v in effects.items()): return None
+            effects.update(step_effects)
+
+        em = problem.environment.expression_manager
+        for fluent, value in preconditions.items():
+            macro.add_precondition(fluent if value else em.Not(fluent))
+        for fluent, value in effects.items():
+            macro.add_effect(fluent, value)
+        return macro
+
+    def __unifiable__(self, a, b):
+        if a.fluent() != b.fluent(): return False
+        for x, y in zip(a.args, b.args):
+            if x == y: continue
+            tx, ty = x.type, y.type
+            if not (tx.is_subtype(ty) or ty.is_subtype(tx)): return False
+            if x.is_object_exp() and y.is_object_exp(): return False
+        return True
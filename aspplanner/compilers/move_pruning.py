@@ -0,0 +1,94 @@
+"""This module finds pairs of consecutive actions that no shortest plan needs, and forbids them."""
+
+from aspplanner.compilers.grounded_task import literals, parameter_atoms
+
+
+class MovePruning:
+    """
+    Move pruning over the lifted actions of a compiled task.
+
+    Three kinds of consecutive pairs are redundant in a shortest (or cheapest) plan:
+        undo:        B right after A restores the state before A, e.g. pick(b) then
+                     drop(b). B's effects are the negated effects of A under a mapping of
+                     B's parameters onto A's, and the values A sets must not have held
+                     before A already, which A's preconditions often guarantee.
+        idempotent:  A right after A, the second application changes nothing.
+        commuting:   A and B neither read nor write what the other one writes, so B then
+                     A reaches the same state. Only the order in which the schemas are
+                     declared is allowed, which keeps the grounding linear in the
+                     number of actions (same-schema pairs are not ordered). The reads
+                     and writes per step about double the ground program, so this part
+                     is only added with `commuting`.
+    Every pruned pair can be removed or swapped without making the plan longer or more
+    expensive, so a shortest plan always survives. The constraints are about consecutive
+    forward steps and `holds`, so regression encodings do not use them.
+    """
+
+    def __init__(self, problem, commuting=False):
+        self.problem   = problem
+        self.commuting = commuting
+        self.schemas   = {}
+        for action in problem.actions:
+            try:
+                pre = parameter_atoms([l for p in action.preconditions for l in literals(p)])
+            except TypeError:
+                continue
+            eff = parameter_atoms([(e.fluent, e.value.is_true()) for e in action.unconditional_effects])
+            if pre is None or eff is None or len(action.conditional_effects) > 0: continue
+            self.schemas[action.name] = (action, pre, sorted(set(eff)))
+        self.inverses = [(a, b, mapping) for a in self.schemas for b in self.schemas for mapping in self.__inverse_mappings__(a, b)]
+
+    def __inverse_mappings__(self, a, b):
+        # the mappings of b's effect parameters onto a's under which b's effects negate a's.
+        _, _, eff_a = self.schemas[a]
+        _, _, eff_b = self.schemas[b]
+        if len(eff_a) != len(eff_b) or len(eff_a) == 0: return []
+        mappings = []
+
+        def _match(idx, mapping, used):
+            if idx == len(eff_a):
+                if mapping not in mappings: mappings.append(mapping)
+                return
+            name_a, args_a, value_a = eff_a[idx]
+            for jdx, (name_b, args_b, value_b) in enumerate(eff_b):
+                if jdx in used or name_a != name_b or value_a == value_b: continue
+                extended = dict(mapping)
+                if all(extended.setdefault(y, x) == x for x, y in zip(args_a, args_b)):
+                    _match(idx + 1, extended, used | {jdx})
+
+        _match(0, {}, frozenset())
+        return mappings
+
+    def __action_term__(self, name, mapping=None):
+        # the parameters of the schema, or the ones they are mapped onto (anonymous when they are not).
+        action = self.schemas[name][0]
+        args   = [p.name if mapping is None else mapping.get(p.name, '_') for p in action.parameters]
+        args   = [a.upper() for a in args]
+        return f'action(("{name}"))' if len(args) == 0 else f'action(("{name}",{",".join(args)}))'
+
+    def __variable_term__(self, name, args):
+        return f'variable(("{name}"))' if len(args) == 0 else f'variable(("{name}",{",".join(a.upper() for a in args)}))'
+
+    def asp_encoding(self):
+        rules = {":- occurs(Action, T), occurs(Action, T + 1)."}
+        for a, b, mapping in self.inverses:
+            _, pre_a, eff_a = self.schemas[a]
+            body = [f"occurs({self.__action_term__(a)}, T)", f"occurs({self.__action_term__(b, mapping)}, T + 1)"]
+            for name, args, value in set(eff_a):
+                # the value a sets has to differ from the one before a, unless a's preconditions require that.
+                if (name, args, not value) in pre_a: continue
+                variable = self.__variable_term__(name, args)
+                body.append(f"{'not ' if value else ''}holds({variable}, value({variable}, true), T - 1)")
+            rules.add(f":- {', '.join(body)}.")
+
+        if not self.commuting: return rules
+        # commuting pairs: the actions of consecutive steps are independent unless one of them writes what the other one uses.
+        rules.add("reads(Variable, T) :- occurs(Action, T), precondition(Action, Variable, Value).")
+        rules.add("writes(Variable, T) :- occurs(Action, T), postcondition(Action, Effect, Variable, Value).")
+        rules.add("interferes(T) :- writes(Variable, T), reads(Variable, T + 1).")
+        rules.add("interferes(T) :- reads(Variable, T), writes(Variable, T + 1).")
+        rules.add("interferes(T) :- writes(Variable, T), writes(Variable, T + 1).")
+        for rank, name in enumerate(self.schemas):
+            rules.add(f"schemaAt({rank}, T) :- occurs({self.__action_term__(name)}, T).")
+        rules.add(":- schemaAt(K, T), schemaAt(L, T + 1), L < K, not interferes(T).")
+        return rules
@@ -0,0 +1,100 @@
+"""This module synthesises groups of mutually exclusive fluents, the multi-valued variables of a SAS+ view."""
+
+from collections import Counter
+from itertools import combinations
+
+from aspplanner.compilers.grounded_task import literals, parameter_atoms
+
+# candidate groups are searched among this many members per key signature, with at most this many fluents.
+MAX_CANDIDATE_MEMBERS = 12
+MAX_GROUP_FLUENTS     = 3
+
+
+class MutexGroups:
+    """
+    Lifted at-most-one invariants in the spirit of Fast Downward's invariant synthesis.
+
+    A member (f, p) counts the atoms of fluent f by its p-th argument, the other
+    arguments form the key (with p None all arguments do, e.g. ontable(b) next to
+    on(b, c) and holding(b)). A group of members with the same key types is an invariant
+    when at most one of its atoms per key holds initially, and every action that adds a
+    member atom deletes another member atom of the same key that its preconditions
+    require. Then the atoms of a key are the values of one multi-valued variable, e.g.
+    {at(b, r), carry(b, g)} of every ball b, plus the value none when no atom holds.
+
+    The groups prefer more fluents, and a fluent belongs to at most one group. Static
+    fluents are left out, they have no frame axioms to save.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.schemas = []
+        for action in problem.actions:
+            try:
+                pre = parameter_atoms([l for p in action.preconditions for l in literals(p)])
+            except TypeError:
+                pre = None
+            eff = parameter_atoms([(e.fluent, e.value.is_true()) for e in action.unconditional_effects])
+            names = set(e.fluent.fluent().name for e in action.effects)
+            self.schemas.append((names, pre, eff, len(action.conditional_effects) > 0))
+        self.groups = self.__synthesise__()
+
+    def __key_types__(self, fluent, position):
+        return tuple(str(p.type) for i, p in enumerate(fluent.signature) if i != position)
+
+    def __synthesise__(self):
+        signatures = {}
+        changing   = set().union(*(names for names, _, _, _ in self.schemas))
+        for fluent in self.problem.fluents:
+            if not fluent.type.is_bool_type() or fluent.name not in changing: continue
+            for position in [None] + list(range(len(fluent.signature))):
+                signatures.setdefault(self.__key_types__(fluent, position), []).append((fluent.name, position))
+
+        candidates = []
+        for members in signatures.values():
+            members = members[:MAX_CANDIDATE_MEMBERS]
+            for size in range(1, MAX_GROUP_FLUENTS + 1):
+                for group in combinations(members, size):
+                    if len(set(name for name, _ in group)) < size: continue
+                    candidates.append(dict(group))
+
+        groups, used = [], set()
+        for group in sorted(candidates, key=lambda g: (-len(g), sorted((n, -1 if p is None else p) for n, p in g.items()))):
+            if used & group.keys() or not self.__is_invariant__(group): continue
+            groups.append(group)
+            used |= group.keys()
+        return groups
+
+    def __is_invariant__(self, group):
+        def _key(name, args):
+            return tuple(a for i, a in enumerate(args) if i != group[name])
+
+        for names, pre, eff, conditional in self.schemas:
+            if not names & group.keys(): continue
+            if eff is None or pre is None or conditional: return False
+            adds = [(name, args) for name, args, value in eff if value and name in group]
+            if len(adds) > 1: return False
+            for name, args in adds:
+                # the add is balanced by a delete of the same key, of an atom that held before.
+                if not any(not value and other in group and _key(other, other_args) == _key(name, args) and (other, other_args) != (name, args)
+                           and (other, other_args, True) in pre for other, other_args, value in eff):
+                    return False
+
+        initial = Counter()
+        for fluent, value in self.problem.initial_values.items():
+            name = fluent.fluent().name
+            if name in group and value.is_true(): initial[_key(name, tuple(str(a) for a in fluent.args))] += 1
+        return all(count <= 1 for count in initial.values())
+
+    def asp_encoding(self):
+        """`member(group(Idx, Key...), Variable)` rules, the lifted members of every group."""
+        rules = set()
+        for idx, group in enumerate(self.groups):
+            for name, position in group.items():
+                arity = len(self.problem.fluent(name).signature)
+                args  = [f'X{i}' for i in range(arity)]
+                key   = [a for i, a in enumerate(args) if i != position]
+                fluent   = f'variable(("{name}",{",".join(args)}))'
+                variable = f'group({",".join([str(idx)] + key)})'
+                rules.add(f"member({variable}, {fluent}) :- variable({fluent}).")
+        return rules
@@ -5,7 +5,7 @@ import unified_planning.engines as engines
 from unified_planning.engines.mixins.compiler import CompilationKind, CompilerMixin
 from unified_planning.engines.results import CompilerResult
 from unified_planning.model.problem_kind_versioning import LATEST_PROBLEM_KIND_VERSION
-from unified_planning.engines.compilers.utils import replace_action
+from unified_planning.engines.compilers.utils import replace_action, updated_minimize_action_costs
 from unified_planning.shortcuts import EffectKind, OperatorKind, InstantaneousAction
 from unified_planning.model.object import Object
 from unified_planning.shortcuts import UserType, Fluent, And, Or, Not
@@ -131,7 +131,8 @@ class Renamer(engines.engine.Engine, CompilerMixin):
         new_problem = Problem(f"{self.name}_{problem.name}", environment=self.env, initial_defaults=_initial_defaults)
 
         # Mapping from old to new.
-        self._types_map:   Dict[up.model.Type, up.model.Type]     = {_type: UserType(_type.name.replace('-', '_'), _type.father) for _type in problem.user_types}
+        self._types_map:   Dict[up.model.Type, up.model.Type]     = {}
+        for _type in problem.user_types: self.__rename_type__(_type)
         self._fluents_map: Dict[up.model.Fluent, up.model.Fluent] = {}
         self._objects_map: Dict[up.model.Object, up.model.Object] = {param.name: new_problem.add_object(param.name.replace('-','_'), self._types_map[param.type]) for param in problem.all_objects}
         self.new_to_old: Dict[Action, Optional[Action]] = {}
@@ -140,11 +141,19 @@ class Renamer(engines.engine.Engine, CompilerMixin):
         self.__rename_actions__(problem, new_problem)
         self.__rename_initial_values__(problem, new_problem)
         self.__rename_goals__(problem, new_problem)
-        pass
+        self.__rename_quality_metrics__(problem, new_problem)
         return CompilerResult(
             new_problem, partial(replace_action, map=self.new_to_old), self.name
         )
     
+    def __rename_quality_metrics__(self, problem: Problem, new_problem: Problem) -> None:
+        # only the metrics that do not refer to fluents are carried over.
+        for metric in problem.quality_metrics:
+            if metric.is_minimize_action_costs():
+                new_problem.add_quality_metric(updated_minimize_action_costs(metric, self.new_to_old, new_problem.environment))
+            elif metric.is_minimize_sequential_plan_length():
+                new_problem.add_quality_metric(metric)
+
     def __rename_goals__(self, problem: Problem, new_problem: Problem) -> None:
         assert len(problem.goals) <= 1, "Renamer currently only supports problems with at most one goal."
         for goal in problem.goals:
@@ -169,6 +178,13 @@ class Renamer(engines.engine.Engine, CompilerMixin):
         _renamed_args   = [self._objects_map[str(a)] for a in fluent.args[0].args] if fluent.is_not() else [self._objects_map[str(a)] for a in fluent.args]
         return Not(_renamed_fluent(*_renamed_args)) if fluent.is_not() else _renamed_fluent(*_renamed_args)
 
+    def __rename_type__(self, _type):
+        # the father is renamed first, so the renamed types keep the hierarchy.
+        if _type not in self._types_map:
+            father = None if _type.father is None else self.__rename_type__(_type.father)
+            self._types_map[_type] = UserType(_type.name.replace('-', '_'), father)
+        return self._types_map[_type]
+
     def __rename_fluents__(self, problem: Problem, new_problem: Problem) -> None:
         env = problem.environment
         for fluent in problem.fluents:
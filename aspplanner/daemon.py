@@ -0,0 +1,227 @@
+"""This module defines a long-running planning daemon served over a local unix socket.
+
+Short-lived processes pay for importing unified_planning, registering the engine,
+building the plan parser and loading the encoding before they plan anything. The
+daemon pays this once: it keeps warm worker processes around, and every worker keeps
+the compiled planners (and their grounded controls) of the problems it has seen. They
+are keyed by the exact domain, problem and options, so only exact repeats reuse a
+planner: a new problem of a known domain is compiled from scratch and only saves the
+start-up costs.
+
+The protocol is one JSON object per line in each direction. A request carries the
+PDDL text of a `domain` and a `problem`, optional planner `options` and an optional
+`timeout` in seconds. UP problems are serialised to PDDL by the client.
+"""
+
+import os
+import json
+import hashlib
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+
+from collections import OrderedDict
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'aspplanner.sock')
+
+
+def request_key(request):
+    """Returns the cache key of a request: identical problems with identical options share planners."""
+    payload = {k: request.get(k) for k in ('domain', 'problem', 'options')}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def __load_problem__(request):
+    from unified_planning.io import PDDLReader
+    return PDDLReader().parse_problem_string(request['domain'], request['problem'])
+
+
+def __serve_request__(request, planners, cache_size):
+    from unified_planning.engines import PlanGenerationResultStatus
+    from aspplanner.asp_planner import ASPPlanner
+    from aspplanner.utilities import plan_to_json
+
+    key     = request['key']
+    planner = planners.pop(key, None)
+    cached  = planner is not None
+    try:
+        if planner is None:
+            options = request.get('options') or {}
+            planner = ASPPlanner(__load_problem__(request), options.get('encoding', 'seq'), **options)
+        planners[key] = planner
+        while len(planners) > cache_size: planners.popitem(last=False)
+        # the metrics of a cached planner cover this request only.
+        planner.reset_statistics()
+        plan = planner.plan()
+    except MemoryError as e:
+        return {'status': PlanGenerationResultStatus.MEMOUT.name, 'plan': [], 'logs': [str(e)], 'cached': cached}
+    except Exception as e:
+        return {'status': PlanGenerationResultStatus.INTERNAL_ERROR.name, 'plan': [], 'logs': [f'{type(e).__name__}: {e}'], 'cached': cached}
+    status = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY if len(plan.actions) == 0 else PlanGenerationResultStatus.SOLVED_SATISFICING
+    return {'status': status.name, 'plan': plan_to_json(plan), 'logs': planner.logs, 'cached': cached, 'metrics': planner.metrics()}
+
+
+def __worker_loop__(conn, cache_size):
+    # pay the start-up costs once, before the first request arrives.
+    import aspplanner
+    import aspplanner.asp_planner
+    planners = OrderedDict()
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        conn.send(__serve_request__(request, planners, cache_size))
+
+
+class _Worker:
+    """A warm worker process together with the pipe used to talk to it."""
+
+    def __init__(self, context, cache_size):
+        self.context    = context
+        self.cache_size = cache_size
+        self.lock       = threading.Lock()
+        self.__spawn__()
+
+    def __spawn__(self):
+        self.conn, child = self.context.Pipe()
+        self.process = self.context.Process(target=__worker_loop__, args=(child, self.cache_size), daemon=True)
+        self.process.start()
+        child.close()
+
+    def __restart__(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.__spawn__()
+
+    def solve(self, request, timeout=None):
+        with self.lock:
+            try:
+                self.conn.send(request)
+                if self.conn.poll(timeout): return self.conn.recv()
+                # the worker is stuck grounding or solving, so we replace it (and lose its caches).
+                self.__restart__()
+                return {'status': 'TIMEOUT', 'plan': [], 'logs': [f'No answer within {timeout} seconds.'], 'cached': False}
+            except (EOFError, OSError):
+                self.__restart__()
+                return {'status': 'INTERNAL_ERROR', 'plan': [], 'logs': ['The worker process died while planning.'], 'cached': False}
+            except BaseException:
+                # its answer would stay in the pipe and go to the next request.
+                self.__restart__()
+                raise
+
+    def stop(self):
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive(): self.process.kill()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip(): continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict): raise TypeError(f'a request is a JSON object, not {type(request).__name__}')
+                response = self.server.daemon.solve(request)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                response = {'status': 'INTERNAL_ERROR', 'plan': [], 'logs': [f'Malformed request: {e}'], 'cached': False}
+            self.wfile.write((json.dumps(response) + '\n').encode())
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class PlanningDaemon:
+    """
+    Serves planning requests over a unix socket using a pool of warm worker processes.
+
+    Requests with the same key are always routed to the same worker, so repeated
+    problems hit that worker's compiled planners and grounded controls.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, workers=2, cache_size=32):
+        self.socket_path = socket_path
+        self.context     = multiprocessing.get_context('spawn')
+        self.workers     = [_Worker(self.context, cache_size) for _ in range(max(1, workers))]
+        self.server      = None
+
+    def solve(self, request):
+        # a malformed timeout fails here, before any worker gets the request.
+        timeout = request.get('timeout')
+        timeout = None if timeout is None else float(timeout)
+        request = dict(request, key=request_key(request), timeout=timeout)
+        worker  = self.workers[int(request['key'], 16) % len(self.workers)]
+        return worker.solve(request, timeout)
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path): os.unlink(self.socket_path)
+        self.server = _Server(self.socket_path, _RequestHandler)
+        self.server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+            if os.path.exists(self.socket_path): os.unlink(self.socket_path)
+        for worker in self.workers: worker.stop()
+
+
+def submit(problem, domain=None, socket_path=DEFAULT_SOCKET, timeout=None, **options):
+    """
+    Thin client: sends one planning request to a running daemon and returns its answer.
+
+    Args:
+        problem: PDDL problem text when `domain` is given, otherwise a UP problem.
+        domain: PDDL domain text.
+        socket_path: path of the daemon's unix socket.
+        timeout: planning time limit in seconds, enforced by the daemon.
+        options: planner options, e.g. encoding='seq'.
+
+    Returns:
+        Dictionary with status, plan, logs, the planner's metrics and whether the daemon had
+        the problem cached.
+        For UP problems the plan is a `SequentialPlan` over the submitted problem, otherwise
+        a list of {action, parameters} records.
+    """
+    writer = None
+    if domain is None:
+        from unified_planning.io import PDDLWriter
+        writer  = PDDLWriter(problem)
+        domain  = writer.get_domain()
+        problem = writer.get_problem()
+
+    request = {'domain': domain, 'problem': problem, 'options': options, 'timeout': timeout}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall((json.dumps(request) + '\n').encode())
+        with s.makefile('r') as f:
+            response = json.loads(f.readline())
+
+    if writer is not None:
+        from unified_planning.plans import SequentialPlan, ActionInstance
+        response['plan'] = SequentialPlan([ActionInstance(writer.get_item_named(r['action']), [writer.get_item_named(p) for p in r['parameters']]) for r in response['plan']])
+    return response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='aspplanner serve', description='Serve ASPPlanner requests over a local unix socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='path of the unix socket to listen on')
+    parser.add_argument('--workers', type=int, default=2, help='number of warm worker processes')
+    parser.add_argument('--cache-size', type=int, default=32, help='compiled planners kept per worker')
+    args = parser.parse_args(argv)
+    PlanningDaemon(args.socket, args.workers, args.cache_size).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""This module defines the persistent store of solved horizons, used to schedule the horizon search."""
+
+import sqlite3
+
+from contextlib import closing
+
+from aspplanner.compilers.macros import domain_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solves (
+    domain      TEXT    NOT NULL,
+    objects     INTEGER NOT NULL,
+    goals       INTEGER NOT NULL,
+    lower_bound INTEGER NOT NULL,
+    encoding    TEXT    NOT NULL,
+    horizon     INTEGER NOT NULL,
+    atoms       INTEGER NOT NULL,
+    rules       INTEGER NOT NULL,
+    solve_time  REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solves_domain ON solves (domain);
+"""
+
+
+def instance_features(task):
+    """The object count, the goal count and the horizon lower bound of a compiled task."""
+    return len(task.all_objects), len(task.asp_encoding['_goal_state']), task.horizon_lower_bound
+
+
+class HorizonHistory:
+    """
+    Solved horizons, ground program sizes and solve times per domain and instance features,
+    in a sqlite file that planners of several threads and processes can share.
+
+    `schedule` predicts the horizons worth trying first from the instances of the same
+    domain that are closest in their features: the horizons between the lower and the
+    upper quartile of their plan lengths, scaled by the ratio of the goal counts, in
+    increasing order. The planner tries the rest from its lower bound afterwards, so a
+    bad prediction costs time, never a plan.
+    """
+
+    def __init__(self, path, neighbours=8, max_window=5, timeout=30.0):
+        self.path       = path
+        self.neighbours = neighbours
+        self.max_window = max_window
+        self.timeout    = timeout
+        with closing(self.__connect__()) as db, db:
+            db.executescript(SCHEMA)
+
+    def __connect__(self):
+        # a connection per call, sqlite connections must not be shared between threads.
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def record(self, task, encoding, horizon, atoms, rules, solve_time):
+        objects, goals, lower_bound = instance_features(task)
+        with closing(self.__connect__()) as db, db:
+            db.execute('INSERT INTO solves VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       (domain_key(task), objects, goals, lower_bound, encoding, horizon, atoms, rules, solve_time))
+
+    def schedule(self, task):
+        """The horizons to try first for the task, empty when the domain has no history."""
+        objects, goals, lower_bound = instance_features(task)
+        with closing(self.__connect__()) as db:
+            rows = db.execute('SELECT objects, goals, lower_bound, horizon FROM solves WHERE domain = ?', (domain_key(task),)).fetchall()
+        if len(rows) == 0: return []
+
+        def _distance(row):
+            return sum(abs(a - b) / max(a, b, 1) for a, b in zip(row[:3], (objects, goals, lower_bound)))
+        # plan lengths mostly grow with the number of goals, the neighbours' are scaled to ours.
+        horizons = sorted(max(lower_bound, round(h * goals / g) if g > 0 else h) for _, g, _, h in sorted(rows, key=_distance)[:self.neighbours])
+        low, high = horizons[len(horizons) // 4], horizons[(3 * len(horizons)) // 4]
+        return list(range(low, min(high, low + self.max_window - 1) + 1))
@@ -0,0 +1,103 @@
+"""This module defines the clingo propagators of the encodings that check part of the plan semantics lazily."""
+
+from collections import defaultdict
+
+
+class FramePropagator:
+    """
+    Enforces the preconditions, the effects and the frame axioms of the 'seq-lazy' encoding.
+
+    The encoding only grounds the `occurs` choices and a free `holds(V, value(V, true), T)`
+    choice per variable and step; a variable is false when that atom is false. Instead
+    of grounding a constraint per action, precondition and step, the clauses are added
+    as nogoods when the literals they are about get assigned:
+        an action occurs at T:      its preconditions hold at T - 1 and its effects at T,
+        a variable changes at T:    one of the actions that change it that way occurs at T.
+    The checks only look at the current assignment, so nothing needs to be undone on
+    backtracking. Every nogood is added once per solver thread and locked, so the solver
+    keeps the part of the frame axioms it ran into, like a ground program would have it.
+    """
+
+    def init(self, init):
+        self.pre, self.eff = defaultdict(list), defaultdict(list)
+        self.adders, self.deleters = defaultdict(list), defaultdict(list)
+        for atom in init.symbolic_atoms.by_signature('precondition', 3):
+            action, variable, value = atom.symbol.arguments
+            self.pre[action].append((variable, value.arguments[1].name == 'true'))
+        for atom in init.symbolic_atoms.by_signature('postcondition', 4):
+            action, _, variable, value = atom.symbol.arguments
+            positive = value.arguments[1].name == 'true'
+            self.eff[action].append((variable, positive))
+            (self.adders if positive else self.deleters)[variable].append(action)
+
+        self.occurs = {}
+        self.holds  = {}
+        self.added  = [set() for _ in range(init.number_of_threads)]
+        self.watches = defaultdict(list)
+        for atom in init.symbolic_atoms.by_signature('occurs', 2):
+            action, step = atom.symbol.arguments
+            lit = init.solver_literal(atom.literal)
+            self.occurs[(action, step.number)] = lit
+            self.watches[lit].append((action, step.number))
+        self.horizon = max((t for _, t in self.occurs), default=0)
+        for atom in init.symbolic_atoms.by_signature('holds', 3):
+            variable, value, step = atom.symbol.arguments
+            if value.arguments[1].name != 'true': continue
+            lit = init.solver_literal(atom.literal)
+            self.holds[(variable, step.number)] = lit
+            self.watches[lit].append((variable, step.number))
+            self.watches[-lit].append((variable, step.number))
+        for lit in self.watches:
+            if not init.assignment.is_fixed(lit): init.add_watch(lit)
+
+    def __holds__(self, variable, step):
+        # a variable without a holds atom is false, the solver literal 1 is always true.
+        return self.holds.get((variable, step), -1)
+
+    def propagate(self, control, changes):
+        for lit in changes:
+            for key in self.watches[lit]:
+                if key in self.occurs and self.occurs[key] == lit:
+                    nogoods = self.__action_nogoods__(*key)
+                else:
+                    nogoods = self.__frame_nogoods__(control.assignment, *key)
+                for nogood in nogoods:
+                    if not self.__add__(control, nogood): return
+
+    def check(self, control):
+        # a total assignment has been propagated completely, this only guards against missed watches.
+        assignment = control.assignment
+        for (action, step), lit in self.occurs.items():
+            if not assignment.is_true(lit): continue
+            for nogood in self.__action_nogoods__(action, step):
+                if not self.__add__(control, nogood): return
+        for variable, step in self.holds:
+            for nogood in self.__frame_nogoods__(assignment, variable, step):
+                if not self.__add__(control, nogood): return
+
+    def __add__(self, control, nogood):
+        # returns False once the assignment is conflicting, then propagation has to stop.
+        added = self.added[control.thread_id]
+        key   = tuple(nogood)
+        if key in added: return True
+        added.add(key)
+        return control.add_nogood(nogood, lock=True) and control.propagate()
+
+    def __action_nogoods__(self, action, step):
+        occurs = self.occurs[(action, step)]
+        for variable, positive in self.pre[action]:
+            held = self.__holds__(variable, step - 1)
+            yield [occurs, -held if positive else held]
+        for variable, positive in self.eff[action]:
+            held = self.__holds__(variable, step)
+            yield [occurs, -held if positive else held]
+
+    def __frame_nogoods__(self, assignment, variable, step):
+        # the variable changed between `step - 1` and `step`, or between `step` and `step + 1`.
+        for t in (step, step + 1):
+            if t < 1 or t > self.horizon: continue
+            before, after = self.__holds__(variable, t - 1), self.__holds__(variable, t)
+            if assignment.is_true(after) and assignment.is_false(before):
+                yield [after, -before] + [-self.occurs[(a, t)] for a in self.adders[variable] if (a, t) in self.occurs]
+            elif assignment.is_false(after) and assignment.is_true(before):
+                yield [-after, before] + [-self.occurs[(a, t)] for a in self.deleters[variable] if (a, t) in self.occurs]
@@ -0,0 +1,100 @@
+"""This module races planner configurations on the same problem in separate processes."""
+
+import time
+import json
+import multiprocessing
+
+from collections import OrderedDict
+from multiprocessing.connection import wait
+
+from aspplanner.daemon import __serve_request__
+
+# configurations raced when the `race` option is True: the lifted, the grounded and the SAS+ encodings, and the lifted one with goal heuristics.
+DEFAULT_RACE = [
+    {'encoding': 'seq'},
+    {'encoding': 'seq-grounded'},
+    {'encoding': 'sas'},
+    {'encoding': 'seq', 'heuristic': 'goal'},
+]
+
+# options that belong to the calling process, the racers do not get them.
+LOCAL_OPTIONS = {'race', 'profiler', 'trace_file', 'result_cache_size', 'result_cache_ttl', 'result_cache_dir'}
+
+
+def race_configurations(options):
+    """The option sets of the `race` option: a list of option dicts or encoding names, each over the other options."""
+    race = options.get('race')
+    race = DEFAULT_RACE if race is True else race
+    base = {k: v for k, v in options.items() if k not in LOCAL_OPTIONS}
+    return [dict(base, **({'encoding': c} if isinstance(c, str) else c)) for c in race]
+
+
+def __racer__(conn, request):
+    conn.send(__serve_request__(request, OrderedDict(), 1))
+    conn.close()
+
+
+def race(problem, configurations, timeout=None):
+    """
+    Plans for the UP `problem` with every configuration in its own process, all under the
+    same `timeout` in seconds. The first plan that also validates against `problem` wins
+    and the other processes are killed.
+
+    Returns a dictionary with status, plan (a `SequentialPlan` over `problem`, or None),
+    logs, metrics and the winning `configuration`. Without a winner the status is TIMEOUT
+    when the deadline passed, otherwise the status of the first racer to give up, and the
+    logs of all racers are kept.
+    """
+    from unified_planning.io import PDDLWriter
+    from aspplanner.utilities import environment_lock, plan_from_json, validate
+
+    with environment_lock(problem.environment):
+        # the racers read the problem as PDDL, the writer maps their names back to our objects.
+        writer  = PDDLWriter(problem)
+        request = {'key': None, 'domain': writer.get_domain(), 'problem': writer.get_problem()}
+
+    # the fork server pays the start-up costs once and forks the racers from it.
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['aspplanner.asp_planner'])
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    racers   = {}
+    for configuration in configurations:
+        reader, sender = context.Pipe(duplex=False)
+        process = context.Process(target=__racer__, args=(sender, dict(request, options=configuration)), daemon=True)
+        process.start()
+        sender.close()
+        racers[reader] = (configuration, process)
+
+    result = {'status': 'TIMEOUT', 'plan': None, 'logs': [], 'metrics': {}, 'configuration': None}
+    status = None
+    try:
+        while len(racers) > 0:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            ready = wait(list(racers), remaining)
+            if len(ready) == 0: break
+            for reader in ready:
+                configuration, process = racers.pop(reader)
+                try:
+                    response = reader.recv()
+                except EOFError:
+                    response = {'status': 'INTERNAL_ERROR', 'plan': [], 'logs': ['The racer died while planning.']}
+                reader.close()
+                process.join()
+                result['logs'] += [f'{json.dumps(configuration, default=str)}: {m}' for m in response['logs']]
+                if response['status'] == 'SOLVED_SATISFICING':
+                    with environment_lock(problem.environment):
+                        plan = plan_from_json(problem, response['plan'], writer.get_pddl_name)
+                        valid, reason = validate(problem, plan)
+                    if valid:
+                        return dict(result, status=response['status'], plan=plan, metrics=response.get('metrics', {}), configuration=configuration)
+                    result['logs'].append(f'{json.dumps(configuration, default=str)}: Plan validation failed: {reason}')
+                    status = status or 'UNSOLVABLE_INCOMPLETELY'
+                elif status is None:
+                    status = response['status']
+        if len(racers) == 0 and status is not None: result['status'] = status
+        return result
+    finally:
+        for reader, (_, process) in racers.items():
+            process.kill()
+            process.join()
+            reader.close()
@@ -0,0 +1,216 @@
+"""This module defines the memoisation cache of planning results, shared by the engines of a process."""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover - not on POSIX, the shared directory is then not locked.
+    fcntl = None
+
+# results that planning the same problem with the same options would produce again.
+CACHEABLE_STATUSES = {'SOLVED_SATISFICING', 'SOLVED_OPTIMALLY', 'UNSOLVABLE_INCOMPLETELY'}
+
+# options that do not change the result of a call.
+UNKEYED_OPTIONS = {'profiler', 'trace_file', 'result_cache_size', 'result_cache_ttl', 'result_cache_dir'}
+
+
+def __canonical_problem__(problem):
+    # not repr(problem): reading the initial values (e.g. writing PDDL) stores their defaults in it.
+    defaults = problem.fluents_defaults
+    initial  = {f: v for f, v in problem.explicit_initial_values.items() if defaults.get(f.fluent(), None) != v}
+    return {
+        'types':    sorted(f'{t} - {t.father}' for t in problem.user_types),
+        'fluents':  sorted(f'{f} = {defaults.get(f, None)}' for f in problem.fluents),
+        'objects':  sorted(f'{o} - {o.type}' for o in problem.all_objects),
+        'actions':  sorted(str(a) for a in problem.actions),
+        'initial':  sorted(f'{f} := {v}' for f, v in initial.items()),
+        'goals':    sorted(str(g) for g in problem.goals),
+        'metrics':  [str(m) for m in problem.quality_metrics],
+    }
+
+
+def result_key(problem, options):
+    """The canonical hash of a UP problem and the planner options that shape its result."""
+    from aspplanner.utilities import environment_lock
+    keyed = {k: v for k, v in options.items() if k not in UNKEYED_OPTIONS}
+    with environment_lock(problem.environment):
+        digest = hashlib.sha256(json.dumps(__canonical_problem__(problem), sort_keys=True).encode())
+    digest.update(json.dumps(keyed, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Planning results by `result_key`, evicted least recently used beyond `max_size`
+    entries and after `ttl` seconds.
+
+    With a `directory` the results are also shared through one JSON file per key, so
+    planners of other processes find them too; the directory is pruned the same way,
+    by modification time. Identical requests that arrive while one of them is being
+    solved wait for it instead of solving again: threads of a process on an event,
+    processes on a lock file per key.
+
+    An entry is the JSON-serialisable {status, plan, logs, metrics} of a result, the plan
+    as `plan_to_json` records, so it can be rebuilt over any copy of the problem.
+    """
+
+    def __init__(self, max_size=128, ttl=None, directory=None):
+        self.max_size  = max_size
+        self.ttl       = ttl
+        self.directory = directory
+        self.entries   = OrderedDict()
+        self.inflight  = {}
+        self.lock      = threading.Lock()
+        if directory is not None: os.makedirs(directory, exist_ok=True)
+
+    def __expired__(self, stored):
+        return self.ttl is not None and time.time() - stored > self.ttl
+
+    def get(self, key):
+        with self.lock:
+            entry = self.__get_local__(key)
+        if entry is None and self.directory is not None:
+            entry = self.__get_shared__(key)
+            if entry is not None: self.__put_local__(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        if entry['status'] not in CACHEABLE_STATUSES: return
+        self.__put_local__(key, entry)
+        if self.directory is not None: self.__put_shared__(key, entry)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached entry of `key` and True, or the entry `compute()` returned and
+        False. Concurrent callers of the same key share a single call to `compute`.
+        """
+        while True:
+            entry = self.get(key)
+            if entry is not None: return entry, True
+            with self.lock:
+                waiting = self.inflight.get(key, None)
+                owner   = waiting is None
+                if owner: self.inflight[key] = waiting = [threading.Event(), None]
+            if not owner:
+                waiting[0].wait()
+                # the owner raised when it left no entry, then one of the waiters solves it.
+                if waiting[1] is not None: return waiting[1], True
+                continue
+            try:
+                with self.__key_lock__(key):
+                    entry = self.get(key)
+                    if entry is not None: return entry, True
+                    entry = compute()
+                    self.put(key, entry)
+                    waiting[1] = entry
+                    return entry, False
+            finally:
+                with self.lock: self.inflight.pop(key, None)
+                waiting[0].set()
+
+    def __get_local__(self, key):
+        stored, entry = self.entries.get(key, (None, None))
+        if entry is None: return None
+        if self.__expired__(stored):
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def __put_local__(self, key, entry):
+        with self.lock:
+            self.entries[key] = (time.time(), entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size: self.entries.popitem(last=False)
+
+    def __path__(self, key, suffix='json'):
+        return os.path.join(self.directory, f'{key}.{suffix}')
+
+    def __get_shared__(self, key):
+        try:
+            with open(self.__path__(key), 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.__expired__(stored['time']):
+            try:
+                os.unlink(self.__path__(key))
+            except OSError:
+                pass
+            return None
+        # the modification time is the recency of the file for pruning.
+        try:
+            os.utime(self.__path__(key))
+        except OSError:
+            pass
+        return stored['entry']
+
+    def __put_shared__(self, key, entry):
+        tmp = self.__path__(key, f'{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'time': time.time(), 'entry': entry}, f)
+        os.replace(tmp, self.__path__(key))
+        if fcntl is not None: self.__prune_locks__()
+        files = [os.path.join(self.directory, n) for n in os.listdir(self.directory) if n.endswith('.json')]
+        if len(files) <= self.max_size: return
+        for path in sorted(files, key=lambda p: os.stat(p).st_mtime if os.path.exists(p) else 0)[:len(files) - self.max_size]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    @contextmanager
+    def __key_lock__(self, key):
+        # other processes solving the same key hold this lock until their result is stored.
+        if self.directory is None or fcntl is None:
+            yield
+            return
+        path = self.__path__(key, 'lock')
+        while True:
+            f = open(path, 'a')
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # the holder before us may have removed the file we waited on, then we lock the new one.
+            try:
+                if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino: break
+            except FileNotFoundError:
+                pass
+            f.close()
+        try:
+            yield
+        finally:
+            # the lock file leaves with its holder, so the directory only keeps the entries.
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            f.close()
+
+    def __prune_locks__(self):
+        # lock files of processes that died while solving, nobody holds them any more.
+        for name in os.listdir(self.directory):
+            if not name.endswith('.lock'): continue
+            try:
+                with open(os.path.join(self.directory, name), 'a') as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+__caches__ = {}
+__caches_lock__ = threading.Lock()
+
+
+def shared_result_cache(max_size=128, ttl=None, directory=None):
+    """The cache of a configuration, shared by all engines of the process that use it."""
+    with __caches_lock__:
+        key = (max_size, ttl, None if directory is None else os.path.abspath(directory))
+        if key not in __caches__: __caches__[key] = ResultCache(max_size, ttl, directory)
+        return __caches__[key]
@@ -1,17 +1,56 @@
-from typing import Callable, IO, Optional
+from typing import Callable, IO, Iterator, Optional
 import unified_planning as up
 from unified_planning.engines.results import CompilerResult
 from unified_planning.engines import PlanGenerationResultStatus, PlanGenerationResult
 import argparse
+import json
 
-from aspplanner.asp_planner import ASPPlanner
+from fractions import Fraction
 
-# We have to args: linear, upper_bound
-class UPASPPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin):
+# clingo and the compilers are imported by the first call to plan, not when the engine is registered.
+def __planner__(problem, options):
+    from aspplanner.asp_planner import ASPPlanner
+    return ASPPlanner(problem, options.get('encoding', 'seq'), **options)
+
+# Options:
+#   encoding:  the encoder_map entry used to translate the problem ('seq'), 'seq-grounded' to ground the
+#              actions in Python, 'seq-lazy' to check the frame axioms in a propagator instead of
+#              grounding them, 'reg' to regress from the goal (no goal_batch), 'sas' for the mutex
+#              groups as multi-valued variables, 'seq-windows' to ground every action and value only at
+#              the steps it can matter at (no goal_batch), or 'auto' to choose between 'seq' and
+#              'seq-grounded' per problem.
+#   threads:   number of clingo solver threads.
+#   portfolio: 'planning' or the path of a clasp portfolio file raced on the solver threads.
+#   heuristic: 'goal', 'achievers', 'rintanen' or the path of a file of #heuristic directives.
+#   landmarks: add landmark constraints and start the horizon search at the landmark bound.
+#   move_pruning: forbid consecutive actions that undo or repeat each other, with 'commuting' also
+#              impose an order on consecutive independent actions.
+#   goal_batch: serialise the goals, planning for this many more goals per stage (not optimal).
+#   macros: path of a JSON macro library whose frequent macros are added to the problem.
+#   learn_macros: count the action sequences of every plan found into the macro library.
+#   macro_support: how often a sequence must have been seen to become a macro (default 2).
+#   opt_strategy: clingo's --opt-strategy in the anytime mode, e.g. 'bb' (default) or 'usc' (core-guided).
+#   trace_file: path of a JSON file the phase timings and per-horizon statistics are written to.
+#   profiler:  callable, called as profiler(event, data) whenever a 'phase' or a 'horizon' ends.
+#   max_ground_atoms, max_ground_rules: estimated ground program size per horizon at which planning stops with MEMOUT.
+#   max_horizon: horizons from this one on are not searched (default 1000), in the anytime mode it bounds
+#              the search for cheaper plans when actions cost 0.
+#   history:   path of a sqlite file of solved horizons per domain, used to pick the first horizons to try.
+#   result_cache_size: keep this many solve results per process and return them again for identical
+#              problems and options, concurrent identical solves run once.
+#   result_cache_ttl: seconds a cached result stays valid (no limit by default).
+#   result_cache_dir: directory the cached results are shared in with other processes.
+#   race:      plan with several configurations in separate processes and return the first validated
+#              plan, the others are killed. A list of option dicts or encoding names, each applied over
+#              the other options, or True for aspplanner.race.DEFAULT_RACE. The solve timeout is the
+#              deadline of all of them.
+class UPASPPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin, up.engines.mixins.PlanRepairerMixin, up.engines.mixins.AnytimePlannerMixin):
     def __init__(self, **options):
         # Read known user-options and store them for using in the `solve` method
         up.engines.Engine.__init__(self)
         up.engines.mixins.OneshotPlannerMixin.__init__(self)
+        up.engines.mixins.PlanRepairerMixin.__init__(self)
+        up.engines.mixins.AnytimePlannerMixin.__init__(self)
         self.conf = options
 
     @property
@@ -43,6 +82,10 @@ class UPASPPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin):
         supported_kind.set_effects_kind('INCREASE_EFFECTS')
         supported_kind.set_effects_kind('DECREASE_EFFECTS')
         supported_kind.set_effects_kind('FLUENTS_IN_NUMERIC_ASSIGNMENTS')
+        supported_kind.set_quality_metrics('ACTIONS_COST')
+        supported_kind.set_quality_metrics('PLAN_LENGTH')
+        supported_kind.set_actions_cost_kind('INT_NUMBERS_IN_ACTIONS_COST')
+        supported_kind.set_actions_cost_kind('REAL_NUMBERS_IN_ACTIONS_COST')
 
         return supported_kind
 
@@ -50,16 +93,98 @@ class UPASPPlanner(up.engines.Engine, up.engines.mixins.OneshotPlannerMixin):
     def supports(problem_kind):
         return problem_kind <= UPASPPlanner.supported_kind()
 
+    @staticmethod
+    def ensures(anytime_guarantee):
+        return anytime_guarantee == up.engines.AnytimeGuarantee.INCREASING_QUALITY
+
+    @staticmethod
+    def supports_plan(plan_kind):
+        return plan_kind == up.plans.PlanKind.SEQUENTIAL_PLAN
+
     def _solve(self, problem: 'up.model.Problem',
               callback: Optional[Callable[['up.engines.PlanGenerationResult'], None]] = None,
               timeout: Optional[float] = None,
               output_stream: Optional[IO[str]] = None) -> 'up.engines.PlanGenerationResult':
-        
-        encoding = self.conf.get('encoding', 'seq')
-        planner = ASPPlanner(problem, encoding)
-        plan = planner.plan()
+        if not any(self.conf.get(k, None) is not None for k in ('result_cache_size', 'result_cache_ttl', 'result_cache_dir')):
+            return self.__solve__(problem, timeout)
+        from aspplanner.result_cache import result_key, shared_result_cache
+        from aspplanner.utilities import plan_to_json, plan_from_json
+        cache = shared_result_cache(self.conf.get('result_cache_size', None) or 128, self.conf.get('result_cache_ttl', None), self.conf.get('result_cache_dir', None))
+
+        def _solve():
+            result = self.__solve__(problem, timeout)
+            return {'status': result.status.name, 'plan': None if result.plan is None else plan_to_json(result.plan), 'logs': [str(m) for m in result.log_messages or []], 'metrics': dict(result.metrics or {})}
+        entry, cached = cache.get_or_compute(result_key(problem, self.conf), _solve)
+        # computed or cached, the plan is rebuilt over this problem's actions and objects, so both read the same.
+        status  = PlanGenerationResultStatus[entry['status']]
+        plan    = None if entry['plan'] is None else plan_from_json(problem, entry['plan'])
+        metrics = dict(entry['metrics'], cached='true') if cached else dict(entry['metrics'])
+        return PlanGenerationResult(status, plan, self.name, metrics=metrics, log_messages=entry['logs'])
+
+    def __solve__(self, problem, timeout=None):
+        if self.conf.get('race', None): return self.__race__(problem, timeout)
+        planner = __planner__(problem, self.conf)
+        try:
+            plan = planner.plan()
+        except MemoryError as e:
+            # GroundingLimitExceeded, see the max_ground_atoms and max_ground_rules options.
+            return PlanGenerationResult(PlanGenerationResultStatus.MEMOUT, None, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs + [str(e)])
         status = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY if len(plan.actions) == 0 else PlanGenerationResultStatus.SOLVED_SATISFICING
-        return PlanGenerationResult(status, plan, self.name, log_messages=planner.logs)
+        return PlanGenerationResult(status, plan, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs)
+
+    def __race__(self, problem, timeout):
+        # the configurations plan in separate processes, the timeout is their shared deadline.
+        from aspplanner.race import race, race_configurations
+        result  = race(problem, race_configurations(self.conf), timeout)
+        metrics = dict(result['metrics'], configuration=json.dumps(result['configuration'], default=str))
+        return PlanGenerationResult(PlanGenerationResultStatus[result['status']], result['plan'], self.name, metrics=metrics, log_messages=result['logs'])
+
+    def _repair(self, problem: 'up.model.Problem', plan: 'up.plans.Plan') -> 'up.engines.PlanGenerationResult':
+        # Warm-started replanning: `plan` is the previous plan, which may no longer be valid.
+        planner = __planner__(problem, self.conf)
+        try:
+            plan = planner.replan(plan)
+        except MemoryError as e:
+            return PlanGenerationResult(PlanGenerationResultStatus.MEMOUT, None, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs + [str(e)])
+        status = PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY if len(plan.actions) == 0 else PlanGenerationResultStatus.SOLVED_SATISFICING
+        return PlanGenerationResult(status, plan, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs)
+
+    def _get_solutions(self, problem: 'up.model.Problem',
+                       timeout: Optional[float] = None,
+                       output_stream: Optional[IO[str]] = None) -> Iterator['up.engines.PlanGenerationResult']:
+        # Every improving plan is reported as an intermediate result, the last result tells how the search ended.
+        planner = __planner__(problem, self.conf)
+        plan = None
+        try:
+            for plan in planner.anytime_plans(timeout):
+                yield PlanGenerationResult(PlanGenerationResultStatus.INTERMEDIATE, plan, self.name, metrics=self.__cost_metrics__(planner), log_messages=planner.logs)
+        except MemoryError as e:
+            # GroundingLimitExceeded: the plans found so far stay valid, the next horizon is just too large.
+            planner.logs.append(str(e))
+            if plan is None:
+                yield PlanGenerationResult(PlanGenerationResultStatus.MEMOUT, None, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs)
+                return
+        if plan is None:
+            status = PlanGenerationResultStatus.TIMEOUT if planner.timed_out else PlanGenerationResultStatus.UNSOLVABLE_INCOMPLETELY
+            yield PlanGenerationResult(status, None, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs)
+            return
+        status = PlanGenerationResultStatus.SOLVED_OPTIMALLY if planner.optimal else PlanGenerationResultStatus.SOLVED_SATISFICING
+        yield PlanGenerationResult(status, plan, self.name, metrics=self.__cost_metrics__(planner), log_messages=planner.logs)
+
+    def enumerate_plans(self, problem: 'up.model.Problem', k: int, distance: str = 'hamming', min_distance: int = 1,
+                        timeout: Optional[float] = None) -> Iterator['up.engines.PlanGenerationResult']:
+        # Streams up to k distinct plans, see ASPPlanner.enumerate_plans for the distances.
+        planner = __planner__(problem, self.conf)
+        for plan in planner.enumerate_plans(k, distance, min_distance, timeout):
+            yield PlanGenerationResult(PlanGenerationResultStatus.SOLVED_SATISFICING, plan, self.name, metrics=self.__metrics__(planner), log_messages=planner.logs)
+
+    def __metrics__(self, planner):
+        # the trace file is rewritten with every result, so it always holds the latest statistics.
+        if self.conf.get('trace_file', None) is not None: planner.write_trace(self.conf['trace_file'])
+        return planner.metrics()
+
+    def __cost_metrics__(self, planner):
+        return dict(self.__metrics__(planner), cost=str(Fraction(planner.cost, planner.task.action_cost_scale)))
 
     def destroy(self):
         pass
\ No newline at end of file
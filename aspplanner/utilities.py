@@ -1,9 +1,27 @@
-from lark import Lark, Tree, Transformer
-import os
-from typing import List, Dict, Any, Union
+import threading
+import weakref
+from clingo import SymbolType
+
+__environment_locks__ = weakref.WeakKeyDictionary()
+__environment_locks_guard__ = threading.Lock()
+
+def environment_lock(environment):
+    """
+    The lock that serialises the use of a UP environment across threads. Its expression
+    manager, type manager and simplifier caches are shared by every problem, plan and
+    compiler of the environment, and are not thread-safe. Grounding and solving never
+    hold it, clingo releases the GIL while it works.
+    """
+    with __environment_locks_guard__:
+        lock = __environment_locks__.get(environment, None)
+        if lock is None:
+            # reentrant, decoding and validating nest in other phases that may hold it.
+            lock = __environment_locks__[environment] = threading.RLock()
+        return lock
+
 
-from unified_planning.shortcuts import PlanValidator
 def validate(task, plan):
+    from unified_planning.shortcuts import PlanValidator
     validation_fail_reason = ''
     if plan is None or task is None:
         return False, "No plan or task provided."
@@ -14,147 +32,51 @@ def validate(task, plan):
     isvalid = validationresult.status.value == 1 if validationresult else False
     return isvalid, validation_fail_reason
 
-class AspPlanTransformer(Transformer):
-    """Transforms parsed ASP facts into structured dictionaries."""
-    
-    def start(self, facts):
-        return list(facts)
-    
-    def fact(self, items):
-        return items[0] if items else None
-    
-    def predicate(self, items):
-        name = str(items[0])
-        args = items[1] if len(items) > 1 else []
-        return {"predicate": name, "args": args}
-    
-    def args(self, items):
-        return list(items)
-    
-    def arg(self, items):
-        return items[0]
-    
-    def tuple(self, items):
-        return {"type": "tuple", "values": items[0] if items else []}
-    
-    def constant(self, items):
-        value = items[0]
-        if hasattr(value, 'value'):
-            value = value.value.strip('"')
-        return {"type": "constant", "value": str(value)}
-    
-    def atom(self, items):
-        return {"type": "atom", "value": str(items[0])}
-    
-    def number(self, items):
-        return {"type": "number", "value": int(items[0])}
-    
-    def string(self, items):
-        return {"type": "string", "value": str(items[0]).strip('"')}
+def plan_to_json(plan):
+    """Serialises a sequential plan into a list of {action, parameters} records."""
+    if plan is None: return []
+    return [{'action': a.action.name, 'parameters': [str(p) for p in a.actual_parameters]} for a in plan.actions]
 
-class AspPlanParser:
-    """Parser for ASP plan facts that returns structured dictionaries."""
-    
-    def __init__(self, grammar_path=None):
-        if grammar_path is None:
-            grammar_path = os.path.join(os.path.dirname(__file__), 'grammars', 'asp_plan_grammar.lark')
-        
-        with open(grammar_path, 'r') as f:
-            grammar = f.read()
-        
-        self.parser = Lark(grammar, start='start', transformer=AspPlanTransformer(), parser='lalr')
-    
-    def parse_plan_fact(self, asp_fact: str) -> Dict[str, Any]:
-        """
-        Parse a single ASP plan fact and return structured data.
-        
-        Args:
-            asp_fact: ASP fact string like 'occurs(action(("navigate", ...)), 1)'
-            
-        Returns:
-            Dictionary with action, arguments, and timestep information
-        """
-        try:
-            parsed = self.parser.parse(asp_fact)
-            
-            if not parsed or len(parsed) == 0:
-                return None
-            
-            fact = parsed[0]
-            
-            # Handle occurs(action(...), timestep) pattern
-            if fact["predicate"] == "occurs" and len(fact["args"]) == 2:
-                action_data = fact["args"][0]
-                timestep_data = fact["args"][1]
-                
-                if (action_data["predicate"] == "action" and timestep_data["type"] == "number"):
-                    
-                    # Extract action tuple
-                    if (len(action_data["args"]) > 0 and action_data["args"][0]["type"] == "tuple"):
-                        
-                        tuple_values = action_data["args"][0]["values"]
-                        
-                        if tuple_values:
-                            action_name = tuple_values[0]["value"]
-                            action_args = []
-                            
-                            for arg in tuple_values[1:]:
-                                if arg["type"] == "constant":
-                                    action_args.append(arg["value"])
-                                elif arg["type"] == "string":
-                                    action_args.append(arg["value"])
-                                elif arg["type"] == "atom":
-                                    action_args.append(arg["value"])
-                                else:
-                                    action_args.append(str(arg["value"]))
-                            
-                            return {
-                                "action": action_name,
-                                "arguments": action_args,
-                                "timestep": timestep_data["value"]
-                            }
-                    else:
-                        # this is a grounded action
-                        return {
-                            "action": action_data["args"][0]["value"],
-                            "arguments": [],
-                            "timestep": timestep_data["value"]
-                        }
-            
-            # For other predicate types, return general structure
-            return {
-                "predicate": fact["predicate"],
-                "args": fact["args"],
-                "raw_fact": fact
-            }
-            
-        except Exception as e:
-            raise ValueError(f"Failed to parse ASP fact '{asp_fact}': {e}")
-    
-    def parse_multiple_facts(self, asp_facts: str) -> List[Dict[str, Any]]:
-        """
-        Parse multiple ASP facts separated by periods.
-        
-        Args:
-            asp_facts: String containing multiple ASP facts
-            
-        Returns:
-            List of dictionaries with parsed fact data
-        """
-        # Split on periods and clean up
-        facts = [fact.strip() for fact in asp_facts.split('.') if fact.strip()]
-        
-        results = []
-        for fact in facts:
-            if not fact.endswith('.'):
-                fact += '.'  # Ensure period for parsing
-            
-            try:
-                parsed = self.parse_plan_fact(fact)
-                if parsed:
-                    results.append(parsed)
-            except Exception as e:
-                print(f"Warning: Failed to parse fact '{fact}': {e}")
-                continue
-        
-        return results
\ No newline at end of file
+def plan_from_json(problem, records, name=None):
+    """
+    Rebuilds the sequential plan of `plan_to_json` records over the actions and objects of
+    `problem`. Plans name them the way the renamer does, with '_' for '-'; `name` gives
+    the name an item had where the plan was found (by default its own name). Exact names
+    win over renamed ones, so `a-b` and `a_b` stay apart when both exist.
+    """
+    from unified_planning.plans import SequentialPlan, ActionInstance
+    name = (lambda item: item.name) if name is None else name
+
+    def _lookup(items):
+        # the renamed names first, then the exact ones over them.
+        named = {name(item).replace('-', '_'): item for item in items}
+        named.update((name(item), item) for item in items)
+        return lambda n: named[n] if n in named else named[n.replace('-', '_')]
+
+    with environment_lock(problem.environment):
+        action, obj = _lookup(list(problem.actions)), _lookup(list(problem.all_objects))
+        return SequentialPlan([ActionInstance(action(r['action']), [obj(p) for p in r['parameters']]) for r in records])
+
+def __symbol_value__(symbol):
+    # "name", constant("name"), name or a number.
+    if symbol.type == SymbolType.String: return symbol.string
+    if symbol.type == SymbolType.Number: return str(symbol.number)
+    if symbol.name == 'constant' and len(symbol.arguments) == 1: return __symbol_value__(symbol.arguments[0])
+    return str(symbol)
+
+def decode_action(symbol):
+    """
+    Returns the action name and the object names of an `occurs(action(("name", constant("o"), ...)), T)`
+    (or an `action(...)`) symbol, straight from the clingo symbol instead of parsing its string.
+    """
+    if symbol.name == 'occurs': symbol = symbol.arguments[0]
+    term = symbol.arguments[0]
+    values = term.arguments if term.type == SymbolType.Function and term.name == '' else [term]
+    return tuple(__symbol_value__(v) for v in values)
+
+def __getattr__(name):
+    # the Lark parser is only needed to parse plan facts from text, the planner decodes clingo symbols directly.
+    if name in ('AspPlanParser', 'AspPlanTransformer'):
+        from aspplanner import plan_parser
+        return getattr(plan_parser, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
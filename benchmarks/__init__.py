@@ -0,0 +1 @@
+"""End-to-end benchmarks of ASPPlanner on generated instances, see `python -m benchmarks.run --help`."""
@@ -0,0 +1,265 @@
+"""Parametric instance generators built on UP shortcuts.
+
+Every generator scales with its object counts, which also drive the plan length.
+The problems are typed (the encoder needs user types) and avoid equality
+preconditions, which the encoder does not support.
+"""
+
+from unified_planning.shortcuts import UserType, BoolType, Fluent, InstantaneousAction, Object, Problem
+
+
+def gripper(balls=4, rooms=2):
+    """A robot with two grippers carries all balls from the first room to the last one."""
+    Room, Ball, Gripper = UserType('room'), UserType('ball'), UserType('gripper')
+    at_robby = Fluent('at-robby', BoolType(), r=Room)
+    at       = Fluent('at', BoolType(), b=Ball, r=Room)
+    free     = Fluent('free', BoolType(), g=Gripper)
+    carry    = Fluent('carry', BoolType(), b=Ball, g=Gripper)
+
+    move = InstantaneousAction('move', frm=Room, to=Room)
+    frm, to = move.parameters
+    move.add_precondition(at_robby(frm))
+    move.add_effect(at_robby(to), True)
+    move.add_effect(at_robby(frm), False)
+
+    pick = InstantaneousAction('pick', b=Ball, r=Room, g=Gripper)
+    b, r, g = pick.parameters
+    pick.add_precondition(at(b, r))
+    pick.add_precondition(at_robby(r))
+    pick.add_precondition(free(g))
+    pick.add_effect(carry(b, g), True)
+    pick.add_effect(at(b, r), False)
+    pick.add_effect(free(g), False)
+
+    drop = InstantaneousAction('drop', b=Ball, r=Room, g=Gripper)
+    b, r, g = drop.parameters
+    drop.add_precondition(carry(b, g))
+    drop.add_precondition(at_robby(r))
+    drop.add_effect(at(b, r), True)
+    drop.add_effect(free(g), True)
+    drop.add_effect(carry(b, g), False)
+
+    problem = Problem(f'gripper-{balls}-{rooms}')
+    for f in (at_robby, at, free, carry): problem.add_fluent(f, default_initial_value=False)
+    for a in (move, pick, drop): problem.add_action(a)
+    room_objs    = [Object(f'room{i}', Room) for i in range(rooms)]
+    gripper_objs = [Object('left', Gripper), Object('right', Gripper)]
+    ball_objs    = [Object(f'ball{i}', Ball) for i in range(balls)]
+    problem.add_objects(room_objs + gripper_objs + ball_objs)
+
+    problem.set_initial_value(at_robby(room_objs[0]), True)
+    for g in gripper_objs: problem.set_initial_value(free(g), True)
+    for b in ball_objs:
+        problem.set_initial_value(at(b, room_objs[0]), True)
+        problem.add_goal(at(b, room_objs[-1]))
+    return problem
+
+
+def blocksworld(blocks=4):
+    """Four-operator blocksworld with an explicit arm: a single tower is reversed."""
+    Block, Arm = UserType('block'), UserType('arm')
+    on       = Fluent('on', BoolType(), x=Block, y=Block)
+    ontable  = Fluent('ontable', BoolType(), x=Block)
+    clear    = Fluent('clear', BoolType(), x=Block)
+    empty    = Fluent('handempty', BoolType(), a=Arm)
+    holding  = Fluent('holding', BoolType(), a=Arm, x=Block)
+
+    pickup = InstantaneousAction('pick-up', a=Arm, x=Block)
+    a, x = pickup.parameters
+    pickup.add_precondition(clear(x))
+    pickup.add_precondition(ontable(x))
+    pickup.add_precondition(empty(a))
+    pickup.add_effect(holding(a, x), True)
+    pickup.add_effect(ontable(x), False)
+    pickup.add_effect(clear(x), False)
+    pickup.add_effect(empty(a), False)
+
+    putdown = InstantaneousAction('put-down', a=Arm, x=Block)
+    a, x = putdown.parameters
+    putdown.add_precondition(holding(a, x))
+    putdown.add_effect(ontable(x), True)
+    putdown.add_effect(clear(x), True)
+    putdown.add_effect(empty(a), True)
+    putdown.add_effect(holding(a, x), False)
+
+    stack = InstantaneousAction('stack', a=Arm, x=Block, y=Block)
+    a, x, y = stack.parameters
+    stack.add_precondition(holding(a, x))
+    stack.add_precondition(clear(y))
+    stack.add_effect(on(x, y), True)
+    stack.add_effect(clear(x), True)
+    stack.add_effect(empty(a), True)
+    stack.add_effect(holding(a, x), False)
+    stack.add_effect(clear(y), False)
+
+    unstack = InstantaneousAction('unstack', a=Arm, x=Block, y=Block)
+    a, x, y = unstack.parameters
+    unstack.add_precondition(on(x, y))
+    unstack.add_precondition(clear(x))
+    unstack.add_precondition(empty(a))
+    unstack.add_effect(holding(a, x), True)
+    unstack.add_effect(clear(y), True)
+    unstack.add_effect(on(x, y), False)
+    unstack.add_effect(clear(x), False)
+    unstack.add_effect(empty(a), False)
+
+    problem = Problem(f'blocksworld-{blocks}')
+    for f in (on, ontable, clear, empty, holding): problem.add_fluent(f, default_initial_value=False)
+    for act in (pickup, putdown, stack, unstack): problem.add_action(act)
+    arm        = Object('arm0', Arm)
+    block_objs = [Object(f'b{i}', Block) for i in range(blocks)]
+    problem.add_objects([arm] + block_objs)
+
+    # b0 on the table, b1 on b0, ...; the goal is the reversed tower.
+    problem.set_initial_value(empty(arm), True)
+    problem.set_initial_value(ontable(block_objs[0]), True)
+    problem.set_initial_value(clear(block_objs[-1]), True)
+    for lower, upper in zip(block_objs, block_objs[1:]):
+        problem.set_initial_value(on(upper, lower), True)
+        problem.add_goal(on(lower, upper))
+    return problem
+
+
+def logistics(packages=2, cities=2, trucks_per_city=1):
+    """Packages travel from the first city's depot to the other cities' depots, by truck and plane.
+
+    Hierarchical typing as in the IPC domain: packages and vehicles share the `at` fluent
+    through their `locatable` father, trucks and airplanes the `in` fluent through `vehicle`.
+    """
+    Locatable, Location, City = UserType('locatable'), UserType('location'), UserType('city')
+    Package, Vehicle          = UserType('package', Locatable), UserType('vehicle', Locatable)
+    Truck, Airplane           = UserType('truck', Vehicle), UserType('airplane', Vehicle)
+
+    at       = Fluent('at', BoolType(), o=Locatable, l=Location)
+    inside   = Fluent('in', BoolType(), p=Package, v=Vehicle)
+    in_city  = Fluent('in-city', BoolType(), l=Location, c=City)
+    airport  = Fluent('airport', BoolType(), l=Location)
+
+    actions = []
+    for vehicle_type, kind in ((Truck, 'truck'), (Airplane, 'airplane')):
+        load = InstantaneousAction(f'load-{kind}', p=Package, v=vehicle_type, l=Location)
+        p, v, l = load.parameters
+        load.add_precondition(at(p, l))
+        load.add_precondition(at(v, l))
+        load.add_effect(inside(p, v), True)
+        load.add_effect(at(p, l), False)
+
+        unload = InstantaneousAction(f'unload-{kind}', p=Package, v=vehicle_type, l=Location)
+        p, v, l = unload.parameters
+        unload.add_precondition(inside(p, v))
+        unload.add_precondition(at(v, l))
+        unload.add_effect(at(p, l), True)
+        unload.add_effect(inside(p, v), False)
+        actions += [load, unload]
+
+    drive = InstantaneousAction('drive-truck', t=Truck, frm=Location, to=Location, c=City)
+    t, frm, to, c = drive.parameters
+    drive.add_precondition(at(t, frm))
+    drive.add_precondition(in_city(frm, c))
+    drive.add_precondition(in_city(to, c))
+    drive.add_effect(at(t, to), True)
+    drive.add_effect(at(t, frm), False)
+
+    fly = InstantaneousAction('fly-airplane', a=Airplane, frm=Location, to=Location)
+    a, frm, to = fly.parameters
+    fly.add_precondition(at(a, frm))
+    fly.add_precondition(airport(frm))
+    fly.add_precondition(airport(to))
+    fly.add_effect(at(a, to), True)
+    fly.add_effect(at(a, frm), False)
+
+    problem = Problem(f'logistics-{packages}-{cities}-{trucks_per_city}')
+    for f in (at, inside, in_city, airport): problem.add_fluent(f, default_initial_value=False)
+    for act in actions + [drive, fly]: problem.add_action(act)
+
+    depots, airports = [], []
+    for i in range(cities):
+        city  = Object(f'city{i}', City)
+        depot = Object(f'depot{i}', Location)
+        port  = Object(f'airport{i}', Location)
+        problem.add_objects([city, depot, port])
+        problem.set_initial_value(in_city(depot, city), True)
+        problem.set_initial_value(in_city(port, city), True)
+        problem.set_initial_value(airport(port), True)
+        for j in range(trucks_per_city):
+            truck = Object(f'truck{i}-{j}', Truck)
+            problem.add_object(truck)
+            problem.set_initial_value(at(truck, depot), True)
+        depots.append(depot)
+        airports.append(port)
+    plane = Object('plane0', Airplane)
+    problem.add_object(plane)
+    problem.set_initial_value(at(plane, airports[0]), True)
+
+    for i in range(packages):
+        package = Object(f'pkg{i}', Package)
+        problem.add_object(package)
+        problem.set_initial_value(at(package, depots[0]), True)
+        problem.add_goal(at(package, depots[1 + i % (cities - 1)] if cities > 1 else airports[0]))
+    return problem
+
+
+def rovers(rovers=1, waypoints=4, samples=2):
+    """Rovers drive along a chain of waypoints, take soil samples and send them from the lander's waypoint."""
+    Rover, Waypoint, Sample = UserType('rover'), UserType('waypoint'), UserType('sample')
+    at            = Fluent('at', BoolType(), r=Rover, w=Waypoint)
+    can_traverse  = Fluent('can-traverse', BoolType(), r=Rover, frm=Waypoint, to=Waypoint)
+    sample_at     = Fluent('sample-at', BoolType(), s=Sample, w=Waypoint)
+    have_sample   = Fluent('have-sample', BoolType(), r=Rover, s=Sample)
+    store_empty   = Fluent('store-empty', BoolType(), r=Rover)
+    visible       = Fluent('visible-from-lander', BoolType(), w=Waypoint)
+    communicated  = Fluent('communicated', BoolType(), s=Sample)
+
+    navigate = InstantaneousAction('navigate', r=Rover, frm=Waypoint, to=Waypoint)
+    r, frm, to = navigate.parameters
+    navigate.add_precondition(at(r, frm))
+    navigate.add_precondition(can_traverse(r, frm, to))
+    navigate.add_effect(at(r, to), True)
+    navigate.add_effect(at(r, frm), False)
+
+    take = InstantaneousAction('take-sample', r=Rover, s=Sample, w=Waypoint)
+    r, s, w = take.parameters
+    take.add_precondition(at(r, w))
+    take.add_precondition(sample_at(s, w))
+    take.add_precondition(store_empty(r))
+    take.add_effect(have_sample(r, s), True)
+    take.add_effect(sample_at(s, w), False)
+    take.add_effect(store_empty(r), False)
+
+    send = InstantaneousAction('communicate-sample', r=Rover, s=Sample, w=Waypoint)
+    r, s, w = send.parameters
+    send.add_precondition(at(r, w))
+    send.add_precondition(have_sample(r, s))
+    send.add_precondition(visible(w))
+    send.add_effect(communicated(s), True)
+    send.add_effect(have_sample(r, s), False)
+    send.add_effect(store_empty(r), True)
+
+    problem = Problem(f'rovers-{rovers}-{waypoints}-{samples}')
+    for f in (at, can_traverse, sample_at, have_sample, store_empty, visible, communicated): problem.add_fluent(f, default_initial_value=False)
+    for act in (navigate, take, send): problem.add_action(act)
+    rover_objs    = [Object(f'rover{i}', Rover) for i in range(rovers)]
+    waypoint_objs = [Object(f'wp{i}', Waypoint) for i in range(waypoints)]
+    sample_objs   = [Object(f'soil{i}', Sample) for i in range(samples)]
+    problem.add_objects(rover_objs + waypoint_objs + sample_objs)
+
+    problem.set_initial_value(visible(waypoint_objs[0]), True)
+    for rover in rover_objs:
+        problem.set_initial_value(at(rover, waypoint_objs[0]), True)
+        problem.set_initial_value(store_empty(rover), True)
+        for a, b in zip(waypoint_objs, waypoint_objs[1:]):
+            problem.set_initial_value(can_traverse(rover, a, b), True)
+            problem.set_initial_value(can_traverse(rover, b, a), True)
+    # the samples lie at the far end of the chain.
+    for i, sample in enumerate(sample_objs):
+        problem.set_initial_value(sample_at(sample, waypoint_objs[-1 - i % max(1, waypoints - 1)]), True)
+        problem.add_goal(communicated(sample))
+    return problem
+
+
+GENERATORS = {
+    'gripper':     gripper,
+    'blocksworld': blocksworld,
+    'logistics':   logistics,
+    'rovers':      rovers,
+}
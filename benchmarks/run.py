@@ -0,0 +1,179 @@
+"""
+Runs a benchmark suite end to end through `OneshotPlanner(name='ASPPlanner')` and
+compares it against a stored baseline.
+
+Every instance is solved in a fresh subprocess, so the peak RSS is the instance's own.
+The wall time, the per-phase times reported in the result metrics and the peak RSS
+are the medians over `--repeat` runs. An instance regresses when one of them grows
+by more than its tolerance over the baseline, or when its status changes; the exit
+code is then 1.
+
+    python -m benchmarks.run --suite small --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --suite small --baseline benchmarks/baseline.json --time-tolerance 0.2
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import multiprocessing
+
+from benchmarks.domains import GENERATORS
+
+
+PHASES = ('compile', 'encode', 'ground', 'solve', 'decode', 'validate')
+
+# (domain, generator parameters); the instances grow in object count and plan length.
+SUITES = {
+    'small': [
+        ('gripper',     {'balls': 2}),
+        ('gripper',     {'balls': 4}),
+        ('blocksworld', {'blocks': 3}),
+        ('blocksworld', {'blocks': 4}),
+        ('logistics',   {'packages': 1}),
+        ('rovers',      {'rovers': 1, 'waypoints': 3, 'samples': 1}),
+        ('rovers',      {'rovers': 1, 'waypoints': 4, 'samples': 2}),
+    ],
+    'medium': [
+        ('gripper',     {'balls': 5}),
+        ('blocksworld', {'blocks': 5}),
+        ('logistics',   {'packages': 2}),
+        ('logistics',   {'packages': 2, 'cities': 3}),
+        ('rovers',      {'rovers': 2, 'waypoints': 5, 'samples': 3}),
+    ],
+}
+
+
+def instance_id(domain, params):
+    return f"{domain}-" + '-'.join(f'{k}{v}' for k, v in sorted(params.items()))
+
+
+def __run_instance__(domain, params, options, conn):
+    import resource
+    from unified_planning.shortcuts import OneshotPlanner, get_environment
+    import aspplanner  # registers the engine.
+
+    get_environment().credits_stream = None
+    record = {}
+    try:
+        problem = GENERATORS[domain](**params)
+        _start  = time.perf_counter()
+        with OneshotPlanner(name='ASPPlanner', params=options) as planner:
+            result = planner.solve(problem)
+        record['time']   = time.perf_counter() - _start
+        record['status'] = result.status.name
+        record['length'] = len(result.plan.actions) if result.plan is not None else None
+        record['phases'] = {p: float(result.metrics[f'{p}_time']) for p in PHASES if f'{p}_time' in result.metrics}
+    except Exception as e:
+        record.update(status='INTERNAL_ERROR', error=f'{type(e).__name__}: {e}')
+    # ru_maxrss is in KiB on Linux.
+    record['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    conn.send(record)
+    conn.close()
+
+
+def run_instance(domain, params, options=None, timeout=None):
+    """Solves one generated instance in a fresh subprocess and returns its measurements."""
+    context = multiprocessing.get_context('spawn')
+    reader, writer = context.Pipe(duplex=False)
+    process = context.Process(target=__run_instance__, args=(domain, params, options or {}, writer))
+    process.start()
+    writer.close()
+
+    record = {'status': None}
+    if reader.poll(timeout):
+        try:
+            record.update(reader.recv())
+        except EOFError:
+            pass
+    process.join(timeout=1)
+    if process.is_alive():
+        process.kill()
+        process.join()
+    if record['status'] is None:
+        record['status'] = 'TIMEOUT' if process.exitcode == -9 else 'INTERNAL_ERROR'
+    return record
+
+
+def run_suite(instances, options=None, repeat=1, timeout=None, output=sys.stderr):
+    """Runs every instance `repeat` times and keeps the medians of its measurements."""
+    results = {}
+    for domain, params in instances:
+        runs = [run_instance(domain, params, options, timeout) for _ in range(repeat)]
+        done = [r for r in runs if 'time' in r]
+        summary = {'domain': domain, 'params': params, 'status': runs[0]['status'], 'length': runs[0].get('length')}
+        if len(done) > 0:
+            summary['time']     = statistics.median(r['time'] for r in done)
+            summary['peak_rss'] = statistics.median(r['peak_rss'] for r in done)
+            summary['phases']   = {p: statistics.median(r['phases'][p] for r in done) for p in done[0]['phases']}
+        results[instance_id(domain, params)] = summary
+        print(f"{instance_id(domain, params):40} {summary['status']:20} {__fmt__(summary.get('time'), 's')} {__fmt__(summary.get('peak_rss'), ' MiB')}", file=output)
+    return results
+
+
+def compare(results, baseline, time_tolerance=0.1, memory_tolerance=0.1, min_time=0.05):
+    """
+    Compares the results with a baseline, relative tolerances are fractions (0.1 is 10%).
+
+    Times below `min_time` seconds are treated as `min_time`, so that noise on tiny
+    instances does not count. Returns (regressions, improvements), lists of messages.
+    """
+    regressions, improvements = [], []
+    for key, current in results.items():
+        if key not in baseline: continue
+        base = baseline[key]
+        if current['status'] != base['status']:
+            regressions.append(f"{key}: status {base['status']} -> {current['status']}")
+            continue
+        if 'time' not in current or 'time' not in base: continue
+
+        checks = [('time', current['time'], base['time'], time_tolerance, max)]
+        checks += [(f'{p} time', current['phases'][p], base['phases'][p], time_tolerance, max)
+                   for p in current['phases'] if p in base.get('phases', {})]
+        checks += [('peak RSS', current['peak_rss'], base['peak_rss'], memory_tolerance, None)]
+        for what, now, before, tolerance, floor in checks:
+            if floor is not None: now, before = floor(now, min_time), floor(before, min_time)
+            change = (now - before) / before if before > 0 else 0.0
+            if change > tolerance: regressions.append(f"{key}: {what} {before:.3f} -> {now:.3f} (+{change:.0%})")
+            elif change < -tolerance: improvements.append(f"{key}: {what} {before:.3f} -> {now:.3f} ({change:.0%})")
+    return regressions, improvements
+
+
+def __fmt__(value, unit):
+    return f'{value:10.3f}{unit}' if value is not None else f"{'-':>10}{unit}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description='End-to-end benchmarks of ASPPlanner.')
+    parser.add_argument('--suite', choices=sorted(SUITES), default='small', help='instances to run (default: small)')
+    parser.add_argument('--domain', action='append', choices=sorted(GENERATORS), help='only run these domains')
+    parser.add_argument('--options', type=json.loads, default={}, help='planner options as a JSON object')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per instance, the medians are kept')
+    parser.add_argument('--timeout', type=float, default=300, help='wall clock limit per run in seconds')
+    parser.add_argument('--baseline', help='JSON file of a previous run to compare against')
+    parser.add_argument('--save-baseline', help='write the results to this JSON file')
+    parser.add_argument('--time-tolerance', type=float, default=0.1, help='allowed relative slowdown (default: 0.1)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1, help='allowed relative peak RSS growth (default: 0.1)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='times below this many seconds count as equal')
+    args = parser.parse_args(argv)
+
+    instances = [(d, p) for d, p in SUITES[args.suite] if args.domain is None or d in args.domain]
+    results   = run_suite(instances, args.options, max(1, args.repeat), args.timeout)
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline is None: return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(results, baseline, args.time_tolerance, args.memory_tolerance, args.min_time)
+    for message in improvements: print(f'improved:  {message}')
+    for message in regressions:  print(f'regressed: {message}')
+    print(f'{len(regressions)} regressions, {len(improvements)} improvements against {args.baseline}')
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Tests of the anytime mode of ASPPlanner."""
+
+from unified_planning.shortcuts import BoolType, Fluent, InstantaneousAction, Int, MinimizeActionCosts, Object, Problem, UserType
+
+from aspplanner.asp_planner import ASPPlanner
+
+
+def zero_cost_problem():
+    # `prepare` is free and repeatable, so no plan length bounds the cost of a cheaper plan.
+    Item, Place = UserType('item'), UserType('place')
+    at    = Fluent('at', BoolType(), i=Item, p=Place)
+    ready = Fluent('ready', BoolType(), i=Item)
+    done  = Fluent('done', BoolType(), i=Item)
+    prepare = InstantaneousAction('prepare', i=Item, p=Place)
+    prepare.add_precondition(at(prepare.i, prepare.p))
+    prepare.add_effect(ready(prepare.i), True)
+    finish = InstantaneousAction('finish', i=Item)
+    finish.add_precondition(ready(finish.i))
+    finish.add_effect(done(finish.i), True)
+    problem = Problem('zero_cost')
+    for f in (at, ready, done): problem.add_fluent(f, default_initial_value=False)
+    problem.add_actions([prepare, finish])
+    box, shelf = Object('box', Item), Object('shelf', Place)
+    problem.add_objects([box, shelf])
+    problem.set_initial_value(at(box, shelf), True)
+    problem.add_goal(done(box))
+    problem.add_quality_metric(MinimizeActionCosts({prepare: Int(0), finish: Int(3)}))
+    return problem
+
+
+def test_zero_cost_actions_stop_after_the_first_plan():
+    planner = ASPPlanner(zero_cost_problem(), 'seq')
+    plans   = list(planner.anytime_plans(timeout=60))
+    assert len(plans) == 1
+    assert [a.action.name for a in plans[-1].actions] == ['prepare', 'finish']
+    assert planner.horizon == 2
+    assert not planner.optimal and not planner.timed_out
+
+
+def test_zero_cost_actions_search_up_to_max_horizon():
+    planner = ASPPlanner(zero_cost_problem(), 'seq', max_horizon=5)
+    plans   = list(planner.anytime_plans(timeout=60))
+    assert len(plans) == 1
+    assert planner.horizon == 4
+    assert not planner.optimal and not planner.timed_out
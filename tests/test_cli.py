@@ -0,0 +1,10 @@
+"""Tests of the batch runner of the command line."""
+
+import sys
+import subprocess
+
+
+def test_fractional_cpu_limits_are_rounded_up():
+    # in a separate process, the limits cannot be raised again.
+    code = "import resource; from aspplanner.cli import __apply_limits__; __apply_limits__(0.5, None); print(*resource.getrlimit(resource.RLIMIT_CPU))"
+    assert subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split() == ['1', '2']
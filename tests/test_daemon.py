@@ -0,0 +1,68 @@
+"""Tests of the planning daemon's socket protocol."""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from unified_planning.io import PDDLWriter
+
+from aspplanner.daemon import PlanningDaemon
+from benchmarks.domains import GENERATORS
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    path   = str(tmp_path / 'aspplanner.sock')
+    server = PlanningDaemon(path, workers=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if server.server is not None: break
+        threading.Event().wait(0.05)
+    yield path
+    server.server.shutdown()
+    thread.join(timeout=5)
+
+
+def test_requests_that_are_not_objects_are_answered(daemon):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(daemon)
+        with s.makefile('rw') as f:
+            for line in ('[]', '"x"', '3', '{not json'):
+                f.write(line + '\n')
+                f.flush()
+                response = json.loads(f.readline())
+                assert response['status'] == 'INTERNAL_ERROR'
+                assert response['logs'][0].startswith('Malformed request')
+
+
+def __request__(name, **fields):
+    writer = PDDLWriter(GENERATORS[name]())
+    return dict(fields, domain=writer.get_domain(), problem=writer.get_problem())
+
+
+def __ask__(path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        with s.makefile('rw') as f:
+            f.write(json.dumps(request) + '\n')
+            f.flush()
+            return json.loads(f.readline())
+
+
+def test_a_malformed_timeout_does_not_answer_the_next_request(daemon):
+    response = __ask__(daemon, __request__('gripper', timeout='soon'))
+    assert response['status'] == 'INTERNAL_ERROR'
+    response = __ask__(daemon, __request__('blocksworld'))
+    assert response['status'] == 'SOLVED_SATISFICING'
+    assert {r['action'] for r in response['plan']} <= {'pick_up', 'put_down', 'stack', 'unstack'}
+
+
+def test_a_cached_planner_reports_this_request_only(daemon):
+    first  = __ask__(daemon, __request__('gripper'))
+    second = __ask__(daemon, __request__('gripper'))
+    assert not first['cached'] and second['cached']
+    assert len(json.loads(second['metrics']['horizons'])) <= len(json.loads(first['metrics']['horizons']))
+    assert float(second['metrics']['compile_time']) == 0.0
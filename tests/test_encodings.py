@@ -0,0 +1,94 @@
+"""Tests of the encodings of ASPPlanner, each one plans as short as the lifted `seq` encoding."""
+
+from functools import lru_cache
+
+import pytest
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+PROBLEMS = {'gripper': {'balls': 2}, 'blocksworld': {}, 'rovers': {}}
+
+
+def __plan__(name, encoding, **options):
+    planner = ASPPlanner(GENERATORS[name](**PROBLEMS[name]), encoding, **options)
+    plan    = planner.plan()
+    valid, reason = validate(planner.task, plan)
+    assert valid, reason
+    return planner, plan
+
+
+@lru_cache(maxsize=None)
+def __seq_length__(name):
+    return len(__plan__(name, 'seq')[1].actions)
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_grounded_encoding(name):
+    planner, plan = __plan__(name, 'seq-grounded')
+    assert planner.encoding == 'seq-grounded'
+    assert len(plan.actions) == __seq_length__(name)
+
+
+@pytest.mark.parametrize('name, encoding', [('gripper', 'seq'), ('rovers', 'seq-grounded')])
+def test_auto_grounds_when_most_groundings_are_pruned(name, encoding):
+    planner, plan = __plan__(name, 'auto')
+    assert planner.encoding == encoding
+    assert len(plan.actions) == __seq_length__(name)
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_lazy_encoding(name):
+    planner, plan = __plan__(name, 'seq-lazy')
+    assert planner.encoding == 'seq-lazy'
+    assert len(plan.actions) == __seq_length__(name)
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_regression_encoding(name):
+    planner, plan = __plan__(name, 'reg')
+    assert len(plan.actions) == __seq_length__(name)
+    # the plan runs forwards although the steps count back from the goal, also when warm-started.
+    replanned = planner.replan(plan)
+    assert validate(planner.task, replanned)[0] and len(replanned.actions) == len(plan.actions)
+
+
+def test_regression_encoding_does_not_serialise_goals():
+    with pytest.raises(AssertionError, match='forward encoding'):
+        ASPPlanner(GENERATORS['gripper'](), 'reg', goal_batch=1).plan()
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_move_pruning(name):
+    pruned, plan       = __plan__(name, 'seq', move_pruning=True)
+    commuting, ordered = __plan__(name, 'seq', move_pruning='commuting')
+    # commuting pairs are ordered on top of the undoing and repeated ones.
+    assert 0 < len(pruned.task.asp_encoding_str['_move_pruning']) < len(commuting.task.asp_encoding_str['_move_pruning'])
+    assert len(plan.actions) == len(ordered.actions) == __seq_length__(name)
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_sas_encoding(name):
+    planner, plan = __plan__(name, 'sas')
+    assert len(planner.task.asp_encoding_str['_groups']) > 0
+    assert len(plan.actions) == __seq_length__(name)
+
+
+def test_sas_encoding_without_groups(capfd):
+    # the hierarchically typed logistics yields no mutex group.
+    planner = ASPPlanner(GENERATORS['logistics'](), 'sas')
+    plan    = planner.plan()
+    assert len(planner.task.asp_encoding_str['_groups']) == 0
+    assert validate(planner.task, plan)[0]
+    assert len(plan.actions) == len(ASPPlanner(GENERATORS['logistics'](), 'seq').plan().actions)
+    assert 'does not occur in any rule head' not in capfd.readouterr().err
+
+
+@pytest.mark.parametrize('name', PROBLEMS)
+def test_windowed_encoding(name):
+    planner, plan = __plan__(name, 'seq-windows')
+    lifted, _     = __plan__(name, 'seq')
+    assert len(plan.actions) == __seq_length__(name)
+    # actions and values are only grounded at the steps they can matter at.
+    assert planner.horizon_stats[-1]['rules'] < lifted.horizon_stats[-1]['rules']
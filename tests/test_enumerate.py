@@ -0,0 +1,25 @@
+"""Tests of the top-k and diverse plan enumeration of ASPPlanner."""
+
+from itertools import combinations
+
+import pytest
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+
+def __distance__(distance, plan, other):
+    steps, others = [str(a) for a in plan.actions], [str(a) for a in other.actions]
+    if distance == 'actions': return len(set(steps) ^ set(others))
+    return sum(a != b for a, b in zip(steps, others)) + abs(len(steps) - len(others))
+
+
+@pytest.mark.parametrize('distance, min_distance', [('hamming', 1), ('hamming', 2), ('actions', 2)])
+def test_plans_are_distinct_and_apart(distance, min_distance):
+    planner = ASPPlanner(GENERATORS['gripper'](balls=2), 'seq')
+    plans   = list(planner.enumerate_plans(6, distance, min_distance, timeout=120))
+    assert len(plans) == 6
+    assert all(validate(planner.task, plan)[0] for plan in plans)
+    assert [len(p.actions) for p in plans] == sorted(len(p.actions) for p in plans)
+    assert all(__distance__(distance, a, b) >= min_distance for a, b in combinations(plans, 2))
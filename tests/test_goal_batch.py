@@ -0,0 +1,20 @@
+"""Tests of the goal serialisation of ASPPlanner."""
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+
+def test_stages_plan_for_all_goals():
+    planner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', goal_batch=1)
+    plan    = planner.plan()
+    assert validate(planner.task, plan)[0]
+    assert max(h['horizon'] for h in planner.horizon_stats) < len(plan.actions)
+
+
+def test_stages_search_up_to_max_horizon():
+    # delivering the first ball takes 3 steps, the second one 4.
+    planner = ASPPlanner(GENERATORS['gripper'](balls=2), 'seq', goal_batch=1, max_horizon=4)
+    assert len(planner.plan().actions) == 0
+    assert [h['horizon'] for h in planner.horizon_stats] == [0, 1, 2, 3, 0, 1, 2, 3]
+    assert planner.logs == ['Goal serialisation found no plan for the first 2 goals.']
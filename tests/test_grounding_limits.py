@@ -0,0 +1,28 @@
+"""Tests of the ground program size limits of ASPPlanner."""
+
+import pytest
+from unified_planning.engines import PlanGenerationResultStatus
+from unified_planning.shortcuts import OneshotPlanner
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.compilers.grounding_estimator import GroundingLimitExceeded
+from benchmarks.domains import GENERATORS
+
+
+def test_the_limit_stops_planning_before_grounding():
+    planner = ASPPlanner(GENERATORS['logistics'](), 'seq', max_ground_atoms=10)
+    with pytest.raises(GroundingLimitExceeded, match='more than 10 atoms'):
+        planner.plan()
+    assert planner.horizon_stats == []
+
+
+def test_the_engine_reports_memout():
+    with OneshotPlanner(name='ASPPlanner', params={'max_ground_rules': 10}) as planner:
+        result = planner.solve(GENERATORS['logistics']())
+    assert result.status == PlanGenerationResultStatus.MEMOUT and result.plan is None
+    assert any('more than 10 rules' in str(m) for m in result.log_messages)
+
+
+def test_generous_limits_do_not_stop_planning():
+    plan = ASPPlanner(GENERATORS['logistics'](), 'seq', max_ground_atoms=10 ** 7, max_ground_rules=10 ** 7).plan()
+    assert len(plan.actions) > 0
@@ -0,0 +1,34 @@
+"""Tests of the horizon history that schedules the horizon search."""
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.history import HorizonHistory
+from benchmarks.domains import GENERATORS
+
+
+def test_the_history_predicts_the_horizon(tmp_path):
+    history = str(tmp_path / 'history.db')
+    first   = ASPPlanner(GENERATORS['gripper'](balls=3), 'seq', history=history)
+    assert len(first.plan().actions) == 9
+    assert first.predicted == [] and [h['horizon'] for h in first.horizon_stats][0] == first.task.horizon_lower_bound
+
+    # the solved horizon is scaled by the goal counts, 9 for 3 balls is 12 for 4 (the shortest plan has 11).
+    planner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', history=history)
+    assert len(planner.plan().actions) == 12
+    assert planner.predicted == [12] and [h['horizon'] for h in planner.horizon_stats] == [12]
+
+
+def test_a_bad_prediction_costs_time_not_the_plan(tmp_path):
+    history = str(tmp_path / 'history.db')
+    planner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', history=history)
+    HorizonHistory(history).record(planner.task, 'seq', 5, 0, 0, 0.0)
+    assert len(planner.plan().actions) == 11
+    horizons = [h['horizon'] for h in planner.horizon_stats]
+    assert planner.predicted == [5] and horizons[0] == 5 and horizons[-1] == 11
+
+
+def test_predictions_stay_below_max_horizon(tmp_path):
+    history = str(tmp_path / 'history.db')
+    planner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', history=history, max_horizon=8)
+    HorizonHistory(history).record(planner.task, 'seq', 12, 0, 0, 0.0)
+    assert len(planner.plan().actions) == 0
+    assert planner.predicted == [] and max(h['horizon'] for h in planner.horizon_stats) == 7
@@ -0,0 +1,16 @@
+"""Tests of the landmark constraints of ASPPlanner."""
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+
+def test_landmarks_keep_the_plan_length_and_ground_quietly(capfd):
+    # two rovers can each take the sample, so there are landmarks but no orderings.
+    plain   = ASPPlanner(GENERATORS['rovers'](rovers=2, waypoints=3, samples=1), 'seq').plan()
+    planner = ASPPlanner(GENERATORS['rovers'](rovers=2, waypoints=3, samples=1), 'seq', landmarks=True)
+    plan    = planner.plan()
+    assert validate(planner.task, plan)[0]
+    assert len(plan.actions) == len(plain.actions)
+    assert planner.min_horizon > 0
+    assert 'does not occur in any rule head' not in capfd.readouterr().err
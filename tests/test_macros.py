@@ -0,0 +1,27 @@
+"""Tests of learning macro actions from plans and planning with them."""
+
+import json
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.compilers.macros import MacroLibrary, domain_key
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+
+def test_macros_are_learned_compiled_and_expanded(tmp_path):
+    library = str(tmp_path / 'macros.json')
+    learner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', macros=library, learn_macros=True)
+    learned = learner.plan()
+    with open(library) as f:
+        support = json.load(f)[domain_key(learner.task)]
+    assert len(support) > 0 and all(len(json.loads(k)) == 2 for k in support)
+    assert len(MacroLibrary(library).macros(learner.task, 1)) == len(support)
+
+    planner = ASPPlanner(GENERATORS['gripper'](balls=4), 'seq', macros=library, macro_support=1)
+    plan    = planner.plan()
+    assert len(planner.macros) > 0
+    # the plan is expanded into primitive actions, and takes fewer steps than it has actions.
+    assert all(a.action.name in ('pick', 'move', 'drop') for a in plan.actions)
+    assert validate(planner.task, plan)[0]
+    assert planner.horizon < len(plan.actions)
+    assert planner.horizon < len(learned.actions)
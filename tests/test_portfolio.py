@@ -0,0 +1,17 @@
+"""Tests of the clasp portfolio of ASPPlanner."""
+
+from aspplanner.asp_planner import ASPPlanner, portfolio_file_map
+from benchmarks.domains import GENERATORS
+
+
+def test_portfolio_lines_leave_the_heuristic_alone():
+    with open(portfolio_file_map['planning']) as f:
+        lines = [l for l in f if not l.startswith('#')]
+    assert not any('--heuristic' in l for l in lines)
+
+
+def test_portfolio_threads_use_the_domain_heuristic():
+    planner = ASPPlanner(GENERATORS['gripper'](balls=1), 'seq', portfolio='planning', threads=8, heuristic='goal')
+    ctl     = planner.__ground__(planner.min_horizon)
+    ctl.solve()
+    assert all(ctl.configuration.solver[i].heuristic.startswith('domain') for i in range(8))
@@ -0,0 +1,39 @@
+"""Tests of racing planner configurations in separate processes."""
+
+import time
+import multiprocessing
+
+import aspplanner.utilities
+from aspplanner.race import race
+from aspplanner.utilities import validate
+from benchmarks.domains import GENERATORS
+
+
+def test_the_winner_plans_over_the_problem():
+    problem = GENERATORS['gripper']()
+    result  = race(problem, [{'encoding': 'seq'}, {'encoding': 'sas'}], timeout=120)
+    assert result['status'] == 'SOLVED_SATISFICING'
+    assert result['configuration'] in ({'encoding': 'seq'}, {'encoding': 'sas'})
+    assert validate(problem, result['plan'])[0]
+
+
+def test_the_losers_are_killed():
+    # the lazy encoding takes seconds on logistics, the lifted one less than one.
+    start  = time.perf_counter()
+    result = race(GENERATORS['logistics'](), [{'encoding': 'seq'}, {'encoding': 'seq-lazy'}], timeout=120)
+    assert result['configuration'] == {'encoding': 'seq'}
+    assert time.perf_counter() - start < 10
+    assert len(multiprocessing.active_children()) == 0
+
+
+def test_nobody_wins_after_the_deadline():
+    result = race(GENERATORS['logistics'](), [{'encoding': 'seq'}, {'encoding': 'sas'}], timeout=0.01)
+    assert result['status'] == 'TIMEOUT' and result['plan'] is None
+    assert len(multiprocessing.active_children()) == 0
+
+
+def test_plans_that_do_not_validate_are_rejected(monkeypatch):
+    monkeypatch.setattr(aspplanner.utilities, 'validate', lambda problem, plan: (False, 'rejected'))
+    result = race(GENERATORS['gripper'](), [{'encoding': 'seq'}, {'encoding': 'sas'}], timeout=120)
+    assert result['status'] == 'UNSOLVABLE_INCOMPLETELY' and result['plan'] is None
+    assert sum('Plan validation failed: rejected' in m for m in result['logs']) == 2
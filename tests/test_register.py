@@ -0,0 +1,19 @@
+"""Tests of the registration of the engine in unified_planning."""
+
+import sys
+import subprocess
+
+
+def __run__(code):
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_registered_when_unified_planning_is_imported_later():
+    code = ("import sys, aspplanner; print('unified_planning' in sys.modules); import unified_planning as up; "
+            "print('ASPPlanner' in up.environment.get_environment().factory.engines, aspplanner.env is up.environment.get_environment())")
+    assert __run__(code) == ['False', 'True', 'True']
+
+
+def test_registered_when_unified_planning_is_imported_first():
+    code = "import unified_planning as up, aspplanner; print('ASPPlanner' in up.environment.get_environment().factory.engines)"
+    assert __run__(code) == ['True']
@@ -0,0 +1,13 @@
+"""Tests of the warm-started replanning of ASPPlanner."""
+
+from aspplanner.asp_planner import ASPPlanner
+from benchmarks.domains import GENERATORS
+
+
+def test_reused_suffix_is_mapped_back_like_a_new_plan():
+    planner = ASPPlanner(GENERATORS['gripper'](balls=1), 'seq')
+    plan    = planner.plan()
+    reused  = planner.replan(plan)
+    assert any('Reused the previous plan' in m for m in planner.logs)
+    assert [str(a) for a in reused.actions] == [str(a) for a in plan.actions]
+    assert all(a.action is b.action for a, b in zip(reused.actions, plan.actions))
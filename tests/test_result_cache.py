@@ -0,0 +1,162 @@
+"""Tests of the memoisation cache of planning results."""
+
+import os
+import time
+import threading
+
+import pytest
+
+from unified_planning.io import PDDLWriter
+from unified_planning.shortcuts import InstantaneousAction, Object, OneshotPlanner, Problem, UserType
+
+from aspplanner.result_cache import ResultCache, result_key
+from aspplanner.utilities import plan_from_json, validate
+from benchmarks.domains import GENERATORS
+
+
+def __entry__(n=0, status='SOLVED_SATISFICING'):
+    return {'status': status, 'plan': [{'action': 'a', 'parameters': [str(n)]}], 'logs': [], 'metrics': {}}
+
+
+def __race__(caches, key, compute, callers=8):
+    # every caller starts at once and asks one of the caches for the same key.
+    barrier, results = threading.Barrier(callers), [None] * callers
+
+    def _call(idx):
+        barrier.wait()
+        results[idx] = caches[idx % len(caches)].get_or_compute(key, compute)
+
+    threads = [threading.Thread(target=_call, args=(idx,)) for idx in range(callers)]
+    for t in threads: t.start()
+    for t in threads: t.join(timeout=30)
+    return results
+
+
+def __slow__(calls, entry, delay=0.2):
+    def _compute():
+        calls.append(1)
+        time.sleep(delay)
+        return entry
+    return _compute
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_size=2)
+    cache.put('a', __entry__(1))
+    cache.put('b', __entry__(2))
+    assert cache.get('a') == __entry__(1)
+    cache.put('c', __entry__(3))
+    assert cache.get('b') is None
+    assert cache.get('a') == __entry__(1) and cache.get('c') == __entry__(3)
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ResultCache(ttl=0.05)
+    cache.put('a', __entry__())
+    assert cache.get('a') is not None
+    time.sleep(0.1)
+    assert cache.get('a') is None
+
+
+def test_results_that_may_change_are_not_stored():
+    cache = ResultCache()
+    for status in ('MEMOUT', 'TIMEOUT', 'INTERNAL_ERROR'): cache.put(status, __entry__(status=status))
+    assert all(cache.get(status) is None for status in ('MEMOUT', 'TIMEOUT', 'INTERNAL_ERROR'))
+
+
+def test_concurrent_identical_requests_compute_once():
+    calls   = []
+    results = __race__([ResultCache()], 'k', __slow__(calls, __entry__()))
+    assert len(calls) == 1
+    assert all(entry == __entry__() for entry, _ in results)
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+
+
+def test_waiters_retry_when_the_owner_fails():
+    calls = []
+
+    def _compute():
+        calls.append(1)
+        time.sleep(0.1)
+        if len(calls) == 1: raise RuntimeError('first solve fails')
+        return __entry__()
+
+    cache, errors, results = ResultCache(), [], []
+
+    def _call():
+        try:
+            results.append(cache.get_or_compute('k', _compute))
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_call) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join(timeout=30)
+    assert len(errors) == 1 and len(calls) == 2 and len(results) == 3
+    assert all(entry == __entry__() for entry, _ in results)
+
+
+def test_uncacheable_results_are_shared_with_the_waiters():
+    calls   = []
+    results = __race__([ResultCache()], 'k', __slow__(calls, __entry__(status='MEMOUT')), callers=4)
+    assert len(calls) == 1
+    assert all(entry['status'] == 'MEMOUT' for entry, _ in results)
+
+
+def test_the_directory_is_shared_between_caches(tmp_path):
+    ResultCache(directory=str(tmp_path)).put('k', __entry__())
+    assert ResultCache(directory=str(tmp_path)).get('k') == __entry__()
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='the directory is only locked on POSIX')
+def test_caches_of_a_directory_compute_once(tmp_path):
+    # separate caches coordinate through the lock files only, like separate processes.
+    calls   = []
+    caches  = [ResultCache(directory=str(tmp_path)) for _ in range(4)]
+    results = __race__(caches, 'k', __slow__(calls, __entry__()))
+    assert len(calls) == 1
+    assert all(entry == __entry__() for entry, _ in results)
+    assert sorted(os.listdir(tmp_path)) == ['k.json']
+
+
+def test_the_directory_is_pruned(tmp_path):
+    cache = ResultCache(max_size=3, directory=str(tmp_path))
+    for n in range(6):
+        cache.get_or_compute(f'k{n}', lambda: __entry__(n))
+        time.sleep(0.01)
+    # a lock file left behind by a process that died while solving.
+    open(tmp_path / 'dead.lock', 'w').close()
+    cache.put('k6', __entry__(6))
+    assert sorted(os.listdir(tmp_path)) == ['k4.json', 'k5.json', 'k6.json']
+
+
+def test_the_key_survives_reading_the_initial_values():
+    # writing PDDL stores the default initial values in the problem.
+    problem = GENERATORS['logistics'](2)
+    key     = result_key(problem, {})
+    PDDLWriter(problem).get_problem()
+    assert result_key(problem, {}) == key
+    assert result_key(problem, {'encoding': 'sas'}) != key
+
+
+def test_computed_and_cached_plans_read_the_same():
+    problem, results = GENERATORS['logistics'](2), []
+    for _ in range(2):
+        with OneshotPlanner(name='ASPPlanner', params={'result_cache_size': 4}) as planner:
+            results.append(planner.solve(problem))
+    assert [r.metrics.get('cached') for r in results] == [None, 'true']
+    assert str(results[0].plan) == str(results[1].plan)
+    assert all(validate(problem, r.plan)[0] for r in results)
+
+
+@pytest.mark.filterwarnings('ignore:Name pick already defined')
+def test_plans_tell_actions_objects_and_renamed_names_apart():
+    # an object named like the action, and two names that only the renamer makes equal.
+    thing   = UserType('thing')
+    pick    = InstantaneousAction('pick', x=thing, y=thing, z=thing)
+    problem = Problem('names')
+    problem.add_action(pick)
+    problem.add_objects([Object(n, thing) for n in ('pick', 'a-b', 'a_b')])
+    plan    = plan_from_json(problem, [{'action': 'pick', 'parameters': ['pick', 'a-b', 'a_b']}])
+    assert plan.actions[0].action is pick
+    assert [p.object() for p in plan.actions[0].actual_parameters] == [problem.object(n) for n in ('pick', 'a-b', 'a_b')]
@@ -0,0 +1,15 @@
+"""Tests of the per-horizon statistics of ASPPlanner."""
+
+from aspplanner.asp_planner import ASPPlanner
+from benchmarks.domains import GENERATORS
+
+
+def test_every_searched_horizon_is_recorded():
+    events  = []
+    planner = ASPPlanner(GENERATORS['gripper'](balls=1), 'seq', profiler=lambda event, data: events.append((event, data)))
+    # horizon 0 cannot reach the goal, the grounder already refutes it.
+    planner.min_horizon = 0
+    plan = planner.plan()
+    horizons = list(range(0, len(plan.actions) + 1))
+    assert [h['horizon'] for h in planner.horizon_stats] == horizons
+    assert [d['horizon'] for e, d in events if e == 'horizon'] == horizons
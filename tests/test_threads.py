@@ -0,0 +1,25 @@
+"""Tests of planning concurrently from a thread pool."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from aspplanner.asp_planner import ASPPlanner
+from aspplanner.utilities import environment_lock, validate
+from benchmarks.domains import GENERATORS
+
+NAMES = ['gripper', 'blocksworld', 'logistics', 'rovers'] * 3
+
+
+def __solve__(problem):
+    # the problems share the default environment, only the planners lock it for us.
+    planner = ASPPlanner(problem, 'seq')
+    plan    = planner.plan()
+    with environment_lock(problem.environment):
+        return len(plan.actions), validate(planner.task, plan)[0]
+
+
+def test_planners_of_a_thread_pool_plan_like_one_after_another():
+    expected = [__solve__(GENERATORS[name]()) for name in NAMES]
+    problems = [GENERATORS[name]() for name in NAMES]
+    with ThreadPoolExecutor(6) as pool:
+        assert list(pool.map(__solve__, problems)) == expected
+    assert all(valid for _, valid in expected)